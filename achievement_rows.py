@@ -0,0 +1,113 @@
+"""実績を 1 行ずつ返すストリーミング API
+
+    from achievement_rows import iter_achievement_rows
+
+    for row in iter_achievement_rows(api_key, steam_id, appids, languages=("japanese", "english")):
+        sink.send(row._asdict())
+
+ゲームごとに取得が終わった順で、そのゲームの行をまとめて yield する。
+内部は ExportPipeline なので、呼び出し側が遅ければ取得も待たされ、メモリは一定のまま。
+一時ファイルは作らない。進捗と失敗は on_progress に RowProgress で通知する。
+"""
+from typing import NamedTuple, Optional
+
+import requests
+
+from export_pipeline import ExportPipeline
+from failure_policy import call_with_retry
+from steam_api import get_global_percentages, get_player_achievements, get_schema
+
+DEFAULT_LANGUAGES = ("japanese",)
+
+
+class AchievementRow(NamedTuple):
+    appid: int
+    language: str
+    game_name: str
+    api_name: str
+    display_name: str
+    description: str
+    achieved: bool
+    unlock_time: Optional[int]    # UNIX 秒（未取得・不明は None）
+    global_pct: Optional[float]   # 全体の取得率 %（with_rarity=False や不明は None）
+
+
+class RowProgress(NamedTuple):
+    done: int                     # 処理済みのゲーム数
+    total: int
+    appid: int
+    rows: int                     # このゲームで出した行数
+    error: Optional[Exception]    # 取得に失敗したとき（行は出ない）
+
+
+def _fetch_game(api_key, steam_id, appid, languages, with_rarity):
+    """1 ゲーム分：取得状況は 1 回、マスタは言語ごとに取る"""
+    status, unlock_times = get_player_achievements(api_key, steam_id, appid)
+    if status is None:
+        return None
+    schemas = [(lang,) + tuple(get_schema(api_key, appid, lang)) for lang in languages]
+    global_pct = {}
+    if with_rarity:
+        try:
+            global_pct = get_global_percentages(appid)
+        except (requests.RequestException, ValueError):
+            pass   # 取得率が取れなくても行は出す
+    return status, unlock_times or {}, schemas, global_pct
+
+
+def rows_for_game(appid, status, unlock_times, schemas, global_pct=None):
+    """取得結果から AchievementRow を作る（schemas は [(言語, ゲーム名, 実績リスト)]）"""
+    global_pct = global_pct or {}
+    for lang, game_name, achievements in schemas:
+        name = game_name or f"AppID {appid}"
+        for a in achievements or ():
+            api = a.get("name")
+            yield AchievementRow(
+                appid=appid,
+                language=lang,
+                game_name=name,
+                api_name=api,
+                display_name=a.get("displayName", ""),
+                description=a.get("description", ""),
+                achieved=status.get(api) == 1,
+                unlock_time=unlock_times.get(api) or None,
+                global_pct=global_pct.get(api),
+            )
+
+
+def iter_achievement_rows(
+    api_key,
+    steam_id,
+    appids,
+    languages=DEFAULT_LANGUAGES,
+    concurrency=4,
+    with_rarity=False,
+    on_progress=None,
+    should_cancel=None,
+):
+    """appids の実績を AchievementRow で順次返すジェネレータ
+
+    実績のないゲーム・非公開は行を出さずに進捗だけ通知する。
+    途中で止める（break / close）と、残りの取得も打ち切られる。
+    """
+    appids = list(appids)
+    languages = tuple(languages) or DEFAULT_LANGUAGES
+    total = len(appids)
+
+    def fetch(appid):
+        return call_with_retry(
+            lambda: _fetch_game(api_key, steam_id, appid, languages, with_rarity),
+            should_cancel=should_cancel,
+        )
+
+    pipeline = ExportPipeline(fetch, concurrency=concurrency, should_cancel=should_cancel)
+    done = 0
+    for appid, result, error in pipeline.run(appids):
+        n = 0
+        if error is None and result is not None:
+            for row in rows_for_game(appid, *result):
+                n += 1
+                yield row
+        done += 1
+        if on_progress:
+            on_progress(RowProgress(done, total, appid, n, error))
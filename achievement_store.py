@@ -0,0 +1,208 @@
+import json
+import os
+import re
+import threading
+import time
+
+from atomic_io import atomic_write_json, atomic_write_text
+
+# -----------------------------
+# 取得済み実績のローカル保存
+# -----------------------------
+# 1 ゲーム = 1 JSON ファイル（<STORE_DIR>/<appid>.json）。
+# 必要なゲームだけ読めばよいので、ライブラリが大きくてもメモリを食わない。
+# 達成率などの絞り込み用に、件数だけの要約を _summary.jsonl へ追記していく。
+# レコードは AppID だけで区別するので、アカウント（SteamID64）ごとに
+# <STORE_DIR>/<SteamID64>/ へ分ける（open_account_store）。
+STORE_DIR = "achievement_store"
+SUMMARY_NAME = "_summary.jsonl"
+OWNED_GAMES_NAME = "_owned_games.json"   # 最後に取得した所有ゲーム一覧（オフライン用）
+
+
+def count_unlocked(achievements, status):
+    """(取得数, 総数) を返す。実績なしのゲームは (0, None)"""
+    if achievements is None:
+        return 0, None
+    status = status or {}
+    return sum(1 for a in achievements if status.get(a.get("name")) == 1), len(achievements)
+
+
+def store_root_for(store_dir, steam_id):
+    """アカウントごとの保存先（<store_dir>/<SteamID64>）。SteamID が空なら store_dir"""
+    steam_id = re.sub(r"[^0-9A-Za-z_-]", "", str(steam_id or ""))
+    return os.path.join(store_dir, steam_id) if steam_id else store_dir
+
+
+def _is_store_file(name):
+    stem, ext = os.path.splitext(name)
+    return (ext == ".json" and stem.isdigit()) or name in (SUMMARY_NAME, OWNED_GAMES_NAME)
+
+
+def migrate_shared_store(store_dir, root):
+    """旧形式（store_dir 直下に全アカウント共通で保存）のファイルを root へ移す
+
+    最初に開いたアカウントのものとして扱う。移したファイル数を返す。
+    """
+    if os.path.abspath(store_dir) == os.path.abspath(root):
+        return 0
+    try:
+        names = [n for n in os.listdir(store_dir) if _is_store_file(n)]
+    except OSError:
+        return 0
+    if not names:
+        return 0
+    os.makedirs(root, exist_ok=True)
+    moved = 0
+    for n in names:
+        src = os.path.join(store_dir, n)
+        dst = os.path.join(root, n)
+        if os.path.exists(dst):
+            os.remove(src)   # アカウント側にあればそちらを残す（他のアカウントへ移さない）
+            continue
+        os.replace(src, dst)
+        moved += 1
+    return moved
+
+
+def open_account_store(store_dir, steam_id):
+    """steam_id のアカウント用の AchievementStore（旧形式の共通データは移してから開く）"""
+    root = store_root_for(store_dir or STORE_DIR, steam_id)
+    migrate_shared_store(store_dir or STORE_DIR, root)
+    return AchievementStore(root)
+
+
+class AchievementStore:
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self._summary_lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def path_for(self, appid):
+        return os.path.join(self.root, f"{int(appid)}.json")
+
+    def load(self, appid):
+        """保存済みレコードを返す（無ければ None）"""
+        try:
+            with open(self.path_for(appid), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def save(self, appid, game_name, achievements, status, fetched_at=None,
+             unlock_times=None, global_pct=None):
+        """取得結果を保存する。実績なしのゲームは achievements=None で記録
+
+        unlock_times は {apiname: 取得日時}、global_pct は {apiname: 全体の取得率 %}
+        """
+        record = {
+            "appid": int(appid),
+            "game_name": game_name,
+            "achievements": achievements,
+            "status": status,
+            "fetched_at": fetched_at if fetched_at is not None else int(time.time()),
+        }
+        if unlock_times is not None:
+            record["unlock_times"] = unlock_times
+        if global_pct is not None:
+            record["global_pct"] = global_pct
+        atomic_write_json(self.path_for(appid), record)
+        self._append_summary(record)
+        return record
+
+    def appids(self):
+        for n in os.listdir(self.root):
+            stem, ext = os.path.splitext(n)
+            if ext == ".json" and stem.isdigit():
+                yield int(stem)
+
+    def save_record(self, appid, record, fallback_name=None):
+        """fetch_game_record() の戻り値をそのまま保存する"""
+        return self.save(
+            appid,
+            record.get("game_name") or fallback_name,
+            record.get("achievements"),
+            record.get("status"),
+            unlock_times=record.get("unlock_times"),
+            global_pct=record.get("global_pct"),
+        )
+
+    def save_owned_games(self, games):
+        atomic_write_json(
+            os.path.join(self.root, OWNED_GAMES_NAME),
+            {"fetched_at": int(time.time()), "games": games},
+        )
+
+    def load_owned_games(self):
+        """保存済みの所有ゲーム一覧。無ければ保存済みレコードから組み立てる"""
+        try:
+            with open(os.path.join(self.root, OWNED_GAMES_NAME), "r", encoding="utf-8") as f:
+                return json.load(f).get("games", [])
+        except (OSError, ValueError):
+            pass
+        return [
+            {"appid": rec["appid"], "name": rec.get("game_name") or f"AppID {rec['appid']}"}
+            for rec in self.iter_records()
+        ]
+
+    def iter_records(self):
+        """保存済みレコードを 1 件ずつ返す"""
+        for appid in self.appids():
+            rec = self.load(appid)
+            if rec is not None:
+                yield rec
+
+    # -----------------------------
+    # 要約（AppID → 取得数 / 総数 / 取得日時）
+    # -----------------------------
+    def _summary_path(self):
+        return os.path.join(self.root, SUMMARY_NAME)
+
+    @staticmethod
+    def _summary_line(record):
+        unlocked, total = count_unlocked(record.get("achievements"), record.get("status"))
+        return json.dumps(
+            [record["appid"], unlocked, total, record.get("fetched_at", 0)]
+        ) + "\n"
+
+    def _ensure_summary(self):
+        """要約ファイルが無い古い保存データは、1 度だけ全レコードから作る"""
+        path = self._summary_path()
+        if not os.path.exists(path):
+            lines = [self._summary_line(rec) for rec in self.iter_records()]
+            atomic_write_text(path, "".join(lines))
+
+    def _append_summary(self, record):
+        with self._summary_lock:
+            self._ensure_summary()
+            with open(self._summary_path(), "a", encoding="utf-8") as f:
+                f.write(self._summary_line(record))
+
+    def summary(self):
+        """{appid: {"unlocked", "total", "fetched_at"}} を返す
+
+        追記型なので同じ AppID は後の行が優先。行が増えすぎたら詰め直す。
+        """
+        path = self._summary_path()
+        with self._summary_lock:
+            self._ensure_summary()
+
+            result = {}
+            n_lines = 0
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        appid, unlocked, total, fetched_at = json.loads(line)
+                    except ValueError:
+                        continue
+                    n_lines += 1
+                    result[appid] = {"unlocked": unlocked, "total": total, "fetched_at": fetched_at}
+
+            if n_lines > 2 * len(result) + 100:
+                atomic_write_text(
+                    path,
+                    "".join(
+                        json.dumps([a, v["unlocked"], v["total"], v["fetched_at"]]) + "\n"
+                        for a, v in result.items()
+                    ),
+                )
+        return result
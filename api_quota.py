@@ -0,0 +1,167 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+from atomic_io import atomic_write_json
+from config_store import default_config_path
+
+# -----------------------------
+# API 呼び出し数の記録（キーごと・日ごと）
+# -----------------------------
+# Steam Web API はキーごとに 1 日の呼び出し上限がある（既定 100,000 回）。
+# 呼び出しのたびに数え、設定フォルダの api_usage.json に残す。
+# キーそのものは保存せず、ハッシュの先頭だけを使う。
+
+DAILY_LIMIT = 100000
+SAVE_INTERVAL = 2.0   # 秒。呼び出しが続いてもこの間隔でしか保存しない
+KEEP_DAYS = 7
+
+_KEY_RE = re.compile(r"[?&]key=([^&]+)")
+
+
+def default_usage_path():
+    return os.path.join(os.path.dirname(default_config_path()), "api_usage.json")
+
+
+def key_id(api_key):
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def key_from_url(url):
+    m = _KEY_RE.search(url)
+    return m.group(1) if m else None
+
+
+def _today():
+    # 日付の切り替わりは UTC で数える
+    return time.strftime("%Y-%m-%d", time.gmtime())
+
+
+class QuotaLedger:
+    def __init__(self, path=None, save_interval=SAVE_INTERVAL):
+        self.path = path or default_usage_path()
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (OSError, ValueError):
+            self._data = {}
+
+    def record(self, api_key, n=1):
+        """api_key で n 回呼んだことを記録する"""
+        if not api_key:
+            return
+        kid = key_id(api_key)
+        day = _today()
+        with self._lock:
+            days = self._data.setdefault(kid, {})
+            days[day] = days.get(day, 0) + n
+            self._dirty = True
+            if self._timer is None:
+                self._timer = threading.Timer(self.save_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def record_url(self, url):
+        """URL に含まれる API Key の分として 1 回記録（キー不要の API は数えない）"""
+        self.record(key_from_url(url))
+
+    def used_today(self, api_key):
+        with self._lock:
+            return self._data.get(key_id(api_key), {}).get(_today(), 0)
+
+    def remaining(self, api_key, limit=DAILY_LIMIT):
+        return max(0, limit - self.used_today(api_key))
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            # 古い日付は捨てる
+            for days in self._data.values():
+                for day in sorted(days)[:-KEEP_DAYS]:
+                    del days[day]
+            snapshot = json.loads(json.dumps(self._data))
+        try:
+            atomic_write_json(self.path, snapshot)
+        except OSError:
+            pass
+
+
+class CallCounter:
+    """数えるだけの QuotaLedger 代わり（保存しない）
+
+    fleet_export のワーカープロセスで数え、結果を親プロセスの QuotaLedger に渡す
+    （複数のプロセスが同じ api_usage.json を書くと数が失われるため）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def record(self, api_key, n=1):
+        if not api_key:
+            return
+        with self._lock:
+            self._counts[api_key] = self._counts.get(api_key, 0) + n
+
+    def record_url(self, url):
+        self.record(key_from_url(url))
+
+    def take(self, api_key):
+        """api_key の分の回数を返し、0 に戻す"""
+        with self._lock:
+            return self._counts.pop(api_key, 0)
+
+
+# -----------------------------
+# Export の呼び出し数見積もり
+# -----------------------------
+class ExportBudget:
+    def __init__(self, needed, remaining, limit, within):
+        self.needed = needed        # 全件を取得するのに必要な呼び出し数（見積もり）
+        self.remaining = remaining  # 今日の残り
+        self.limit = limit
+        self.within = within        # 残りに収まる分だけの items（先頭から）
+
+    @property
+    def fits(self):
+        return self.needed <= self.remaining
+
+
+def estimate_calls(appid, known=None, schema_cached=None):
+    """1 ゲームの取得に必要な（キーつきの）呼び出し数
+
+    取得状況 1 回 + 実績マスタ 1 回。前回「実績なし」だったゲーム（known の total が None）は
+    マスタを取らないので 1 回、マスタがキャッシュ済みでも 1 回。
+    全体の取得率はキー不要なので数えない。
+    """
+    if schema_cached is not None and schema_cached(appid):
+        return 1
+    summ = (known or {}).get(appid)
+    if summ is not None and summ.get("total") is None:
+        return 1
+    return 2
+
+
+def plan_export(items, api_key, ledger, limit=DAILY_LIMIT, store=None, schema_cached=None):
+    """items（[(appid, name)]）の Export に必要な呼び出し数と、残りに収まる範囲を返す"""
+    known = store.summary() if store is not None else None
+    remaining = ledger.remaining(api_key, limit)
+    needed = 0
+    within = []
+    for item in items:
+        needed += estimate_calls(item[0], known, schema_cached)
+        if needed <= remaining:
+            within.append(item)
+    return ExportBudget(needed, remaining, limit, within)
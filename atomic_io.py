@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+
+
+# -----------------------------
+# アトミックなファイル書き込み
+# -----------------------------
+def atomic_write_text(path, text, encoding="utf-8"):
+    """同じフォルダの一時ファイルに書いてから os.replace で差し替える"""
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".part", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding=encoding, newline="") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path, data):
+    atomic_write_text(path, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """ファイル内容の SHA-256（16 進）"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def same_content(a, b):
+    """2 つのファイルの中身が同じか（サイズが違えば読まずに False）"""
+    try:
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+    except OSError:
+        return False
+    return file_digest(a) == file_digest(b)
+
+
+class AtomicOutput:
+    """出力先と同じフォルダに一時フォルダを作り、そこへの書き込みパスを渡す
+
+    commit() で一時フォルダ内のファイルをすべて os.replace で出力先フォルダへ移す
+    （目次ファイル path は最後）。discard() や例外時は一時フォルダごと捨てるので、
+    既存の出力はそのまま残る。HTML のように複数ファイルを出すライターにも使える。
+
+    skip_unchanged=True なら、既存ファイルと中身が同じものは置き換えない
+    （更新日時も変わらないので、同期ツールやバックアップが反応しない）。
+    prune（ファイル名の正規表現）を渡すと、出力先フォルダでそれに合うのに今回書かなかった
+    ファイル（前回の HTML の余ったページなど）を commit 時に消す。
+    commit 後、replaced / unchanged / removed に各ファイル名が入る。
+    """
+
+    def __init__(self, path, skip_unchanged=False, prune=None):
+        self.path = path
+        self.skip_unchanged = skip_unchanged
+        self.prune = prune
+        self.replaced = []
+        self.unchanged = []
+        self.removed = []
+        self._dir = os.path.dirname(os.path.abspath(path))
+        self._name = os.path.basename(path)
+        self._tmp_dir = None
+
+    @property
+    def changed(self):
+        return bool(self.replaced or self.removed)
+
+    def open(self):
+        """一時フォルダを作り、書き込み先のパスを返す"""
+        os.makedirs(self._dir, exist_ok=True)
+        self._tmp_dir = tempfile.mkdtemp(prefix=".tmp-export-", dir=self._dir)
+        return os.path.join(self._tmp_dir, self._name)
+
+    def commit(self):
+        try:
+            files = sorted(os.listdir(self._tmp_dir), key=lambda n: n == self._name)
+            for n in files:
+                src = os.path.join(self._tmp_dir, n)
+                dst = os.path.join(self._dir, n)
+                if self.skip_unchanged and same_content(src, dst):
+                    self.unchanged.append(n)
+                    continue
+                os.replace(src, dst)
+                self.replaced.append(n)
+            if self.prune:
+                self._remove_stale(set(files))
+        finally:
+            self.discard()
+
+    def _remove_stale(self, written):
+        for n in sorted(os.listdir(self._dir)):
+            if n in written or not re.fullmatch(self.prune, n):
+                continue
+            try:
+                os.remove(os.path.join(self._dir, n))
+            except OSError:
+                continue
+            self.removed.append(n)
+
+    def discard(self):
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+
+def atomic_output(path, skip_unchanged=False, prune=None):
+    """with atomic_output(path) as tmp_path: ... の形で使う（AtomicOutput 参照）"""
+    return AtomicOutput(path, skip_unchanged=skip_unchanged, prune=prune)
@@ -0,0 +1,78 @@
+"""達成率の集計（completion_stats）の NumPy 版と純 Python 版を比べる
+
+  python benchmarks/bench_completion_stats.py [--games 5000] [--achievements 40]
+
+合成した保存済みレコードで両方の所要時間を測り、結果が一致するかも確かめる。
+取得率は Steam と同じく同率が多くなるよう、少ない種類の値から選ぶ。
+一致しなければ終了コード 1 で終わる。
+"""
+import argparse
+import random
+import sys
+import time
+
+import synthetic  # noqa: F401  （リポジトリのルートを import パスに入れる）
+
+import completion_stats
+from completion_stats import AchievementColumns, compute_summary
+
+RARITY_VALUES = (0.1, 0.5, 1.0, 2.0, 5.5, 12.0, 40.0)
+
+
+def synthetic_columns(games, achievements, seed=0):
+    rnd = random.Random(seed)
+    cols = AchievementColumns()
+    for g in range(games):
+        names = [f"ACH_{g}_{i}" for i in range(rnd.randint(1, achievements * 2))]
+        cols.add_record(
+            {
+                "appid": g,
+                "game_name": f"Game {g}",
+                "achievements": [{"name": n, "displayName": n} for n in names],
+                "status": {n: int(rnd.random() < 0.4) for n in names},
+                "unlock_times": {n: 1400000000 + rnd.randint(0, 300000000) for n in names},
+                "global_pct": {n: rnd.choice(RARITY_VALUES) for n in names},
+            }
+        )
+    return cols
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - t0) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--achievements", type=int, default=40)
+    args = parser.parse_args()
+
+    cols = synthetic_columns(args.games, args.achievements)
+    print(f"games {args.games} / achievements {len(cols)}")
+
+    py, py_ms = _timed(lambda: compute_summary(cols, use_numpy=False))
+    print(f"  python : {py_ms:8.1f} ms")
+    if completion_stats.np is None:
+        print("  numpy  : (not installed)")
+        return
+
+    nu, np_ms = _timed(lambda: compute_summary(cols, use_numpy=True))
+    print(f"  numpy  : {np_ms:8.1f} ms  (x{py_ms / np_ms:.1f})")
+
+    # 小さいライブラリ（候補が top_n 前後）でも一致を確かめる
+    mismatches = [k for k in py if py[k] != nu[k]]
+    for n in (1, 3, 10, 200):
+        small = synthetic_columns(n, 5, seed=n)
+        a = compute_summary(small, use_numpy=False)
+        b = compute_summary(small, use_numpy=True)
+        mismatches += [f"{k} (games={n})" for k in a if a[k] != b[k]]
+    if mismatches:
+        print("MISMATCH: " + ", ".join(mismatches))
+        sys.exit(1)
+    print("  results identical")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Export 中のメインスレッド CPU 使用率を測る
+
+  xvfb-run python benchmarks/bench_export_cpu.py [--games 200] [--latency 0.05]
+
+偽 API で実際の SteamAchievementsGUI に Export させ、
+その間メインスレッド（描画・進捗アニメーション）が使った CPU 時間を出す。
+あわせて進捗ゲージ 1 回更新あたりのコストも測る。
+"""
+import argparse
+import os
+import tempfile
+import time
+import tkinter as tk
+
+from synthetic import synthetic_games, make_fake_record
+
+import steam_achievements_export as app_mod
+
+
+def _mute_dialogs():
+    for name in ("showinfo", "showwarning", "showerror"):
+        setattr(app_mod.messagebox, name, lambda *a, **k: None)
+
+
+def bench_progress_updates(app, n=2000):
+    """progress_var.set 1 回あたりの所要時間（µs）"""
+    t0 = time.perf_counter()
+    for i in range(n):
+        app.progress_var.set((i % 1000) / 10.0)
+    app.root.update_idletasks()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # 設定や保存データは一時フォルダへ（ユーザーの設定を汚さない）
+    tmp = tempfile.mkdtemp(prefix="bench-export-")
+    os.chdir(tmp)
+    os.environ["APPDATA"] = tmp
+    _mute_dialogs()
+    games = synthetic_games(args.games)
+    app_mod.get_owned_games = lambda api_key, steam_id: list(games)
+    app_mod.fetch_game_record = make_fake_record(args.latency)
+
+    root = tk.Tk()
+    app = app_mod.SteamAchievementsGUI(root)
+    app.api_key.set("bench")
+    app.steam_id.set("bench")
+    result = {}
+
+    def start_export():
+        if app._loading or not app.round_checks:
+            root.after(50, start_export)
+            return
+        app.select_all_games()
+        result["cpu0"] = time.thread_time()
+        result["wall0"] = time.perf_counter()
+        app.on_export_achievements()
+        root.after(50, wait_done)
+
+    def wait_done():
+        if app._exporting:
+            root.after(50, wait_done)
+            return
+        result["cpu"] = time.thread_time() - result["cpu0"]
+        result["wall"] = time.perf_counter() - result["wall0"]
+        result["update_us"] = bench_progress_updates(app)
+        root.destroy()
+
+    root.after(500, start_export)
+    root.mainloop()
+
+    print(f"games            : {args.games}")
+    print(f"export wall time : {result['wall']:.2f} s")
+    print(f"main-thread CPU  : {result['cpu']:.2f} s ({result['cpu'] / result['wall'] * 100:.1f}%)")
+    print(f"progress update  : {result['update_us']:.1f} µs / set")
+
+
+if __name__ == "__main__":
+    main()
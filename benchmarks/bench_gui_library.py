@@ -0,0 +1,206 @@
+"""大きなライブラリでの GUI 性能を測る
+
+  xvfb-run python benchmarks/bench_gui_library.py [--sizes 1000,10000,50000]
+
+合成したゲーム一覧を実際の SteamAchievementsGUI に流し込み、次を測る。
+  - 一覧の構築時間（_on_fetch_games_done → 最初の 1 画面 / 全行が表示されるまで）
+  - 構築中にイベント処理が止まる最長時間（入力が固まる時間の目安）
+  - 検索 1 文字ごとの絞り込み時間
+  - すべて選択（チェック表示の追従まで）
+  - スクロール 1 フレームの時間
+  - ログ追記 1 行の時間
+  - メモリ（構築前後の RSS）
+サイズごとに別プロセスで測るので、前のサイズのメモリは残らない。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+from synthetic import synthetic_games
+
+import steam_achievements_export as app_mod
+
+DEFAULT_SIZES = "1000,10000,50000"
+SEARCH_TEXT = "dark souls"
+SCROLL_FRAMES = 200
+LOG_LINES = 500
+PUMP_TIMEOUT = 120   # 秒。分割処理が終わらないときはここで打ち切る
+
+
+def _rss_mb():
+    """現在の RSS（MB）。取れない環境では None"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _pump(root, done, timeout=PUMP_TIMEOUT):
+    """done() が真になるまでイベントを回す（after/idle で分割処理される場合も待つ）"""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{timeout} 秒以内に終わりませんでした")
+        root.update()
+    root.update_idletasks()
+
+
+def _timed(root, fn):
+    t0 = time.perf_counter()
+    fn()
+    root.update_idletasks()
+    return (time.perf_counter() - t0) * 1000
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * 0.95))]
+
+
+def measure(size):
+    for name in ("showinfo", "showwarning", "showerror"):
+        setattr(app_mod.messagebox, name, lambda *a, **k: None)
+
+    # 起動時の自動取得（root.after で予約される）やボタンから API を呼ばないようにする。
+    # 予約はコンストラクタの中で束縛されるので、作る前にクラス側を差し替える
+    app_mod.SteamAchievementsGUI.on_fetch_games = lambda self: None
+
+    games = sorted(synthetic_games(size), key=lambda g: g["name"].lower())
+    root = tk.Tk()
+    root.geometry("1100x720")
+    app = app_mod.SteamAchievementsGUI(root)
+    root.update()
+
+    result = {"games": size}
+    rss0 = _rss_mb()
+
+    # 一覧の構築
+    t0 = time.perf_counter()
+    app._on_fetch_games_done(games, None)
+    root.update_idletasks()
+    result["first_ms"] = (time.perf_counter() - t0) * 1000
+    stalls = []
+    deadline = t0 + PUMP_TIMEOUT
+    while len(app.round_checks) < size:
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{PUMP_TIMEOUT} 秒以内に一覧ができませんでした（{len(app.round_checks)}/{size}）")
+        t1 = time.perf_counter()
+        root.update()
+        stalls.append((time.perf_counter() - t1) * 1000)
+    root.update_idletasks()
+    result["build_ms"] = (time.perf_counter() - t0) * 1000
+    result["stall_ms_max"] = max(stalls, default=0.0)
+    rss1 = _rss_mb()
+    if rss0 is not None and rss1 is not None:
+        result["rss_mb"] = rss1
+        result["rss_delta_mb"] = rss1 - rss0
+
+    # 検索（1 文字ずつ入力 → 全部消す）
+    app.search_entry.focus_set()
+    keystrokes = [
+        _timed(root, lambda t=SEARCH_TEXT[:i]: app.search_var.set(t))
+        for i in range(1, len(SEARCH_TEXT) + 1)
+    ]
+    result["filter_ms_mean"] = sum(keystrokes) / len(keystrokes)
+    result["filter_ms_max"] = max(keystrokes)
+    result["filter_clear_ms"] = _timed(root, lambda: app.search_var.set(""))
+
+    # すべて選択（チェック表示が追いつくまで）
+    t0 = time.perf_counter()
+    app.select_all_games()
+    _pump(root, lambda: app._check_refresh_after is None)
+    result["select_all_ms"] = (time.perf_counter() - t0) * 1000
+
+    # スクロール
+    canvas = app.games_canvas
+    frames = []
+    for i in range(SCROLL_FRAMES):
+        direction = 1 if (i // 50) % 2 == 0 else -1
+        t0 = time.perf_counter()
+        canvas.yview_scroll(direction * 3, "units")
+        root.update()
+        frames.append((time.perf_counter() - t0) * 1000)
+    result["scroll_ms_mean"] = sum(frames) / len(frames)
+    result["scroll_ms_p95"] = _p95(frames)
+
+    # ログ追記
+    t0 = time.perf_counter()
+    for i in range(LOG_LINES):
+        app.log(f"Game {i} (AppID: {i * 10}) 取得中...")
+    root.update_idletasks()
+    result["log_us_per_line"] = (time.perf_counter() - t0) / LOG_LINES * 1e6
+
+    root.destroy()
+    return result
+
+
+def _print_table(results):
+    cols = [
+        ("games", "games", "{:>7}"),
+        ("first_ms", "first ms", "{:>9.0f}"),
+        ("build_ms", "build ms", "{:>10.0f}"),
+        ("stall_ms_max", "stall max", "{:>10.0f}"),
+        ("filter_ms_mean", "key ms", "{:>8.1f}"),
+        ("filter_ms_max", "key max", "{:>8.1f}"),
+        ("select_all_ms", "sel-all ms", "{:>11.0f}"),
+        ("scroll_ms_p95", "scroll p95", "{:>11.1f}"),
+        ("log_us_per_line", "log µs", "{:>8.0f}"),
+        ("rss_delta_mb", "RSS +MB", "{:>8.1f}"),
+    ]
+    print(" ".join(f"{title:>{len(fmt.format(0))}}" for _, title, fmt in cols))
+    for r in results:
+        cells = []
+        for key, title, fmt in cols:
+            width = len(fmt.format(0))
+            value = r.get(key)
+            cells.append(fmt.format(value) if value is not None else "-".rjust(width))
+        print(" ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="カンマ区切りのゲーム数")
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)   # 子プロセス用
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出す")
+    args = parser.parse_args()
+
+    if args.size:
+        # 設定や保存データは一時フォルダへ（ユーザーの設定を汚さない）
+        tmp = tempfile.mkdtemp(prefix="bench-gui-")
+        os.chdir(tmp)
+        os.environ["APPDATA"] = tmp
+        print(json.dumps(measure(args.size)))
+        return
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--size", str(size)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""API 応答の JSON 解析の速さを比べる
+
+  python benchmarks/bench_json_decode.py [--cassette export.cassette.gz] [--games 5000]
+
+--cassette を渡すと記録した GetOwnedGames / GetSchemaForGame の応答を使う。
+無ければ同じ形の合成データ（大きなライブラリ、実績の多いゲーム）を作る。
+入っている実装（json / ujson / orjson）ごとに、本文の bytes から
+使う項目だけを取り出すまでの時間を測る。
+"""
+import argparse
+import json
+import random
+import time
+
+from synthetic import synthetic_games
+
+import fast_json
+from http_cassette import _open
+
+
+def synthetic_payloads(games, schemas, achievements, seed=0):
+    """GetOwnedGames 1 件と GetSchemaForGame schemas 件の本文（bytes）"""
+    rnd = random.Random(seed)
+    owned = []
+    for g in synthetic_games(games, seed):
+        g = dict(g)
+        # 実際の応答にある、使わない項目
+        g.update(
+            img_icon_url="%040x" % rnd.getrandbits(160),
+            playtime_windows_forever=g["playtime_forever"],
+            playtime_mac_forever=0,
+            playtime_linux_forever=0,
+            playtime_deck_forever=0,
+            playtime_disconnected=0,
+            content_descriptorids=[2, 5],
+        )
+        owned.append(g)
+    payloads = {
+        "owned": [json.dumps({"response": {"game_count": games, "games": owned}}).encode()],
+        "schema": [],
+    }
+    for s in range(schemas):
+        count = rnd.randint(achievements // 2, achievements * 2)
+        ach = [
+            {
+                "name": f"ACH_{s}_{i}",
+                "defaultvalue": 0,
+                "displayName": f"実績 {i}",
+                "hidden": rnd.randint(0, 1),
+                "description": f"ゲーム {s} の実績 {i} の説明" * rnd.randint(1, 3),
+                "icon": f"https://cdn.example.com/{s}/{'%040x' % rnd.getrandbits(160)}.jpg",
+                "icongray": f"https://cdn.example.com/{s}/{'%040x' % rnd.getrandbits(160)}.jpg",
+            }
+            for i in range(count)
+        ]
+        game = {"gameName": f"Game {s}", "gameVersion": "1",
+                "availableGameStats": {"achievements": ach, "stats": []}}
+        payloads["schema"].append(json.dumps({"game": game}, ensure_ascii=False).encode())
+    return payloads
+
+
+def cassette_payloads(path):
+    payloads = {"owned": [], "schema": []}
+    with _open(path, "r") as f:
+        for line in f:
+            entry = json.loads(line)
+            if entry.get("status") != 200 or "body" not in entry:
+                continue
+            if "GetOwnedGames" in entry["url"]:
+                payloads["owned"].append(entry["body"].encode("utf-8"))
+            elif "GetSchemaForGame" in entry["url"]:
+                payloads["schema"].append(entry["body"].encode("utf-8"))
+    return payloads
+
+
+def decoders():
+    """(名前, bytes → オブジェクト)。resp.json() 相当の「str にしてから解析」も入れる"""
+    result = [("json (resp.json)", lambda b: json.loads(b.decode("utf-8"))),
+              ("json (bytes)", json.loads)]
+    if fast_json.ujson is not None:
+        result.append(("ujson", fast_json.ujson.loads))
+    if fast_json.orjson is not None:
+        result.append(("orjson", fast_json.orjson.loads))
+    return result
+
+
+def extract(kind, data):
+    if kind == "owned":
+        return fast_json.slim_owned_games(data.get("response", {}).get("games", []))
+    game = data.get("game", {})
+    return fast_json.slim_schema(game.get("availableGameStats", {}).get("achievements", []))
+
+
+def bench(kind, bodies, loads, repeat):
+    best_parse = best_total = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parsed = [loads(b) for b in bodies]
+        t1 = time.perf_counter()
+        for data in parsed:
+            extract(kind, data)
+        t2 = time.perf_counter()
+        best_parse = min(best_parse, t1 - t0)
+        best_total = min(best_total, t2 - t0)
+    return best_parse, best_total
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cassette", default=None)
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--schemas", type=int, default=300)
+    parser.add_argument("--achievements", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.cassette:
+        payloads = cassette_payloads(args.cassette)
+    else:
+        payloads = synthetic_payloads(args.games, args.schemas, args.achievements)
+
+    print(f"backend in use: {fast_json.BACKEND}")
+    for kind, bodies in payloads.items():
+        if not bodies:
+            continue
+        size = sum(len(b) for b in bodies)
+        print(f"\n{kind}: {len(bodies)} payloads, {size / 1e6:.1f} MB")
+        print(f"  {'decoder':<18} {'parse ms':>9} {'MB/s':>8} {'+extract ms':>12}")
+        base = None
+        for name, loads in decoders():
+            parse, total = bench(kind, bodies, loads, args.repeat)
+            base = base or parse
+            print(
+                f"  {name:<18} {parse * 1e3:9.1f} {size / 1e6 / parse:8.0f} "
+                f"{total * 1e3:12.1f}  (x{base / parse:.1f})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""合成した大きなライブラリの Export でメモリのピークを測り、予算を超えたら失敗する
+
+  python benchmarks/bench_memory_budget.py [--games 10000] [--budget 32] [--top 5] [--gui]
+
+GUI と同じ部品（AchievementStore・ExportPipeline・レポート出力）で、偽 API から
+games 件を取得して CSV に書き、続けて保存済みの結果から HTML を作り直す。
+そのあと GUI が一覧の裏で持つデータ（保存済みの要約からのファセット索引）を作る。
+--gui を付けると実際の SteamAchievementsGUI に一覧を流し込み、全行のチェック（round_checks）と
+ログ 1 ゲーム 1 行分まで作る（表示が必要。Tk 側のメモリは数えないので RSS は bench_gui_library で見る）。
+tracemalloc で各段階の使用量と増えた場所を出し、ピークが --budget MB を超えたら
+終了コード 1 で終わる。tests/test_memory_budget.py が同じ関数で予算を確かめる。
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from synthetic import synthetic_games, make_fake_record
+
+from achievement_store import AchievementStore
+from export_pipeline import ExportPipeline
+from game_facets import GameIndex
+from memory_profile import MemoryProfiler
+from report_writers import open_report_writer, write_records
+
+DEFAULT_GAMES = 10000
+DEFAULT_BUDGET_MB = 32   # 10k ゲームで実測 16 MB の 2 倍
+GUI_BUILD_TIMEOUT = 300  # 秒
+
+
+def run_export(games, work_dir, profiler, achievements=30):
+    store = AchievementStore(os.path.join(work_dir, "store"))
+    store.save_owned_games(games)
+    profiler.checkpoint("一覧", games=len(games))
+
+    fetch = make_fake_record(0.0, achievements)
+    pipeline = ExportPipeline(
+        fetch=lambda g: fetch("bench", "bench", g["appid"]),
+        transform=lambda g, rec: store.save_record(g["appid"], rec, g["name"]),
+        concurrency=8,
+    )
+    writer = open_report_writer("csv", os.path.join(work_dir, "out.csv"))
+    try:
+        for g, rec, error in pipeline.run(games):
+            if error is None and rec["achievements"] is not None:
+                writer.write_game(g["appid"], rec["game_name"], rec["achievements"], rec["status"])
+    finally:
+        writer.close()
+    profiler.checkpoint("取得・CSV", rows=writer.rows)
+
+    items = [(g["appid"], g["name"]) for g in games]
+    writer = open_report_writer("html", os.path.join(work_dir, "out.html"))
+    try:
+        write_records(writer, store, items)
+    finally:
+        writer.close()
+    profiler.checkpoint("HTML（保存済みから）", games=len(items))
+    return store
+
+
+def run_gui_model(games, store, profiler):
+    """GUI の _rebuild_game_index と同じく、一覧と保存済みの要約から索引を作る"""
+    index = GameIndex(games, store.summary())
+    profiler.checkpoint("ファセット索引", games=len(games))
+    return index
+
+
+def run_gui(games, store, profiler, log_lines=None):
+    """実際の GUI に一覧を流し込み、全行のチェックとログ log_lines 行（省略時はゲーム数）を作る
+
+    表示が無いと tkinter.TclError。設定ファイルを汚さないよう、呼び出し側で
+    APPDATA と作業フォルダを一時フォルダにしておく。
+    """
+    import tkinter as tk
+    import steam_achievements_export as app_mod
+
+    # 起動時の自動取得（コンストラクタの中で root.after に束縛される）で API を呼ばないようにする
+    original = app_mod.SteamAchievementsGUI.on_fetch_games
+    app_mod.SteamAchievementsGUI.on_fetch_games = lambda self: None
+    root = tk.Tk()
+    try:
+        app = app_mod.SteamAchievementsGUI(root)
+        app.store = store
+        app._on_fetch_games_done(games, None)
+        deadline = time.perf_counter() + GUI_BUILD_TIMEOUT
+        while len(app.round_checks) < len(games):
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"{GUI_BUILD_TIMEOUT} 秒以内に一覧ができませんでした")
+            root.update()
+        for g in games[: len(games) if log_lines is None else log_lines]:
+            app.log(f"{g['name']} (AppID: {g['appid']}) 取得中...")
+        root.update_idletasks()
+        profiler.checkpoint(
+            "GUI（一覧・ログ）", games=len(app.games), rows=len(app.round_checks)
+        )
+        return len(app.round_checks)
+    finally:
+        root.destroy()
+        app_mod.SteamAchievementsGUI.on_fetch_games = original
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET_MB, help="ピークの上限（MB）")
+    parser.add_argument("--top", type=int, default=5, help="段階ごとに出す確保元の数")
+    parser.add_argument("--gui", action="store_true", help="実際の GUI の一覧・ログも作る（表示が必要）")
+    args = parser.parse_args()
+
+    # 一覧そのもの（self.games 相当）も数えるため、作る前から計測する
+    profiler = MemoryProfiler(enabled=True, top=args.top).start()
+    games = sorted(synthetic_games(args.games), key=lambda g: g["name"].lower())
+    work_dir = tempfile.mkdtemp(prefix="bench-memory-")
+    cwd = os.getcwd()
+    try:
+        store = run_export(games, work_dir, profiler)
+        run_gui_model(games, store, profiler)
+        if args.gui:
+            # 設定や選択の保存先を一時フォルダへ（ユーザーの設定を汚さない）
+            os.environ["APPDATA"] = work_dir
+            os.chdir(work_dir)
+            run_gui(games, store, profiler)
+        peak_mb = profiler.peak / 2**20
+    finally:
+        profiler.stop()
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    ok = peak_mb <= args.budget
+    print(f"\ngames {args.games}: peak {peak_mb:.1f} MB / budget {args.budget:.0f} MB"
+          f" → {'OK' if ok else 'OVER BUDGET'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
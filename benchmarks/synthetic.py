@@ -0,0 +1,75 @@
+"""ベンチマーク用の合成データと偽 API"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_WORDS = ["Dark", "Souls", "Star", "Quest", "Legend", "Craft", "Racing", "Tactics",
+          "Shadow", "Island", "Dungeon", "Kingdom", "Space", "Farm", "Zero", "Neon"]
+
+
+def synthetic_games(n, seed=0):
+    """GetOwnedGames 相当のゲーム一覧を n 件作る"""
+    rnd = random.Random(seed)
+    now = int(time.time())
+    games = []
+    for i in range(n):
+        name = " ".join(rnd.choice(_WORDS) for _ in range(rnd.randint(1, 4)))
+        games.append(
+            {
+                "appid": 10 + i * 10,
+                "name": f"{name} {i}",
+                "playtime_forever": rnd.choice([0, 0, rnd.randint(1, 20000)]),
+                "rtime_last_played": rnd.choice([0, now - rnd.randint(0, 3 * 365 * 86400)]),
+                "has_community_visible_stats": rnd.random() < 0.7,
+                "img_icon_url": "",
+            }
+        )
+    return games
+
+
+def make_fake_schema(latency=0.0, achievements=30, seed=0):
+    """get_schema_and_achievements と同じ形の結果を返す偽関数を作る"""
+    def fake(api_key, steam_id, appid):
+        if latency:
+            time.sleep(latency)
+        rnd = random.Random(seed * 1000003 + int(appid))
+        count = rnd.randint(1, achievements * 2)
+        schema = [
+            {
+                "name": f"ACH_{appid}_{i}",
+                "displayName": f"実績 {i}",
+                "description": f"AppID {appid} の実績 {i} の説明",
+                "icon": "",
+                "icongray": "",
+            }
+            for i in range(count)
+        ]
+        status = {a["name"]: int(rnd.random() < 0.4) for a in schema}
+        return f"Game {appid}", schema, status
+
+    return fake
+
+
+def make_fake_record(latency=0.0, achievements=30, seed=0):
+    """fetch_game_record と同じ形の結果を返す偽関数を作る"""
+    fake_schema = make_fake_schema(latency, achievements, seed)
+
+    def fake(api_key, steam_id, appid, with_rarity=False):
+        game_name, schema, status = fake_schema(api_key, steam_id, appid)
+        rnd = random.Random(int(appid))
+        record = {
+            "game_name": game_name,
+            "achievements": schema,
+            "status": status,
+            "unlock_times": {
+                k: 1400000000 + rnd.randint(0, 300000000) for k, v in status.items() if v
+            },
+        }
+        if with_rarity:
+            record["global_pct"] = {a["name"]: rnd.uniform(0.1, 90.0) for a in schema}
+        return record
+
+    return fake
@@ -0,0 +1,215 @@
+import json
+import time
+from array import array
+
+from atomic_io import atomic_output
+from compressed_io import COMPRESSION_EXTENSIONS, compression_for_path
+
+try:
+    import numpy as np
+except ImportError:   # NumPy が無ければ純 Python で計算する
+    np = None
+
+# -----------------------------
+# 達成率の集計
+# -----------------------------
+# 保存済みレコードを列ごとの配列（ゲーム単位・実績単位）に読み込み、
+# ゲーム別の達成率・全体の合計・取得日の分布・取得済みのレア実績を計算する。
+
+RAREST_TOP_N = 20
+
+
+class AchievementColumns:
+    """実績 1 件 = 1 行の列指向データ"""
+
+    def __init__(self):
+        # ゲーム単位
+        self.appids = array("q")
+        self.game_names = []
+        # 実績単位
+        self.game_idx = array("q")      # appids への添字
+        self.achieved = array("b")      # 0 / 1
+        self.unlocktime = array("q")    # 未取得・不明は 0
+        self.rarity = array("d")        # 全体の取得率 %（不明は -1）
+        self.names = []                 # 実績の表示名
+
+    def __len__(self):
+        return len(self.achieved)
+
+    def add_record(self, rec):
+        achievements = rec.get("achievements")
+        if not achievements:
+            return
+        status = rec.get("status") or {}
+        unlock_times = rec.get("unlock_times") or {}
+        global_pct = rec.get("global_pct") or {}
+
+        gi = len(self.appids)
+        self.appids.append(int(rec["appid"]))
+        self.game_names.append(rec.get("game_name") or f"AppID {rec['appid']}")
+
+        for a in achievements:
+            api = a.get("name")
+            self.game_idx.append(gi)
+            self.achieved.append(1 if status.get(api) == 1 else 0)
+            self.unlocktime.append(int(unlock_times.get(api, 0) or 0))
+            self.rarity.append(float(global_pct.get(api, -1.0)))
+            self.names.append(a.get("displayName", "") or api or "")
+
+
+def load_columns(store, appids=None):
+    """store から列データを作る（appids 指定時はそのゲームだけ）"""
+    cols = AchievementColumns()
+    if appids is None:
+        records = store.iter_records()
+    else:
+        records = (store.load(a) for a in appids)
+    for rec in records:
+        if rec:
+            cols.add_record(rec)
+    return cols
+
+
+# -----------------------------
+# 集計本体
+# -----------------------------
+def _month(ts):
+    return time.strftime("%Y-%m", time.gmtime(ts))
+
+
+def _per_game_numpy(cols):
+    n_games = len(cols.appids)
+    gi = np.frombuffer(cols.game_idx, dtype=np.int64)
+    achieved = np.frombuffer(cols.achieved, dtype=np.int8).astype(np.int64)
+    unlocked = np.bincount(gi, weights=achieved, minlength=n_games).astype(np.int64)
+    total = np.bincount(gi, minlength=n_games).astype(np.int64)
+    return unlocked.tolist(), total.tolist()
+
+
+def _per_game_python(cols):
+    n_games = len(cols.appids)
+    unlocked = [0] * n_games
+    total = [0] * n_games
+    for gi, ach in zip(cols.game_idx, cols.achieved):
+        total[gi] += 1
+        unlocked[gi] += ach
+    return unlocked, total
+
+
+def _unlock_months_numpy(cols):
+    times = np.frombuffer(cols.unlocktime, dtype=np.int64)
+    times = times[times > 0]
+    if not times.size:
+        return {}
+    months = times.astype("datetime64[s]").astype("datetime64[M]")
+    keys, counts = np.unique(months, return_counts=True)
+    return {str(k): int(c) for k, c in zip(keys, counts)}
+
+
+def _unlock_months_python(cols):
+    result = {}
+    for ts in cols.unlocktime:
+        if ts > 0:
+            m = _month(ts)
+            result[m] = result.get(m, 0) + 1
+    return dict(sorted(result.items()))
+
+
+def _rarest_numpy(cols, top_n):
+    achieved = np.frombuffer(cols.achieved, dtype=np.int8)
+    rarity = np.frombuffer(cols.rarity, dtype=np.float64)
+    idx = np.nonzero((achieved == 1) & (rarity >= 0))[0]
+    if not idx.size:
+        return []
+    if idx.size > top_n:
+        # top_n 番目の値と同じ取得率の実績はすべて候補に残す（同率は添字順で決める）
+        kth = np.partition(rarity[idx], top_n - 1)[top_n - 1]
+        idx = idx[rarity[idx] <= kth]
+    # 取得率 → 添字の順（_rarest_python と同じ並び）
+    return idx[np.lexsort((idx, rarity[idx]))][:top_n].tolist()
+
+
+def _rarest_python(cols, top_n):
+    idx = [
+        i for i, (ach, r) in enumerate(zip(cols.achieved, cols.rarity))
+        if ach == 1 and r >= 0
+    ]
+    idx.sort(key=lambda i: cols.rarity[i])
+    return idx[:top_n]
+
+
+def compute_summary(cols, top_n=RAREST_TOP_N, use_numpy=None):
+    """集計結果を dict で返す（NumPy があればベクトル演算で計算）"""
+    if use_numpy is None:
+        use_numpy = np is not None
+    use_numpy = use_numpy and np is not None and len(cols) > 0
+
+    if use_numpy:
+        unlocked, total = _per_game_numpy(cols)
+        months = _unlock_months_numpy(cols)
+        rarest = _rarest_numpy(cols, top_n)
+    else:
+        unlocked, total = _per_game_python(cols)
+        months = _unlock_months_python(cols)
+        rarest = _rarest_python(cols, top_n)
+
+    games = []
+    for appid, name, u, t in zip(cols.appids, cols.game_names, unlocked, total):
+        games.append(
+            {
+                "appid": appid,
+                "game_name": name,
+                "unlocked": u,
+                "total": t,
+                "completion_pct": round(u / t * 100.0, 2) if t else 0.0,
+            }
+        )
+    games.sort(key=lambda g: (-g["completion_pct"], g["game_name"].lower()))
+
+    sum_u = sum(unlocked)
+    sum_t = sum(total)
+    return {
+        "totals": {
+            "games": len(games),
+            "achievements": sum_t,
+            "unlocked": sum_u,
+            "completion_pct": round(sum_u / sum_t * 100.0, 2) if sum_t else 0.0,
+            "perfect_games": sum(1 for g in games if g["total"] and g["unlocked"] == g["total"]),
+        },
+        "unlocks_by_month": months,
+        "rarest_unlocked": [
+            {
+                "game_name": cols.game_names[cols.game_idx[i]],
+                "achievement": cols.names[i],
+                "global_pct": round(cols.rarity[i], 2),
+            }
+            for i in rarest
+        ],
+        "games": games,
+    }
+
+
+def summary_path_for(output_path):
+    """出力ファイルの横に置く集計ファイルのパス"""
+    stem = output_path
+    method = compression_for_path(stem)
+    if method:
+        stem = stem[: -len(COMPRESSION_EXTENSIONS[method])]
+    for ext in (".csv", ".html"):
+        if stem.lower().endswith(ext):
+            stem = stem[: -len(ext)]
+            break
+    return stem + "_summary.json"
+
+
+def write_summary(store, appids, output_path):
+    """appids の集計を出力ファイルの横に書き、そのパスを返す
+
+    中身が前回と同じなら置き換えない（更新日時が変わらず、同期・バックアップを起こさない）。
+    """
+    path = summary_path_for(output_path)
+    summary = compute_summary(load_columns(store, appids))
+    with atomic_output(path, skip_unchanged=True) as tmp_path:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+    return path
@@ -0,0 +1,142 @@
+import codecs
+import queue
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:   # zstandard が無ければ gzip だけ使える
+    zstandard = None
+
+# -----------------------------
+# 圧縮しながら書き出すテキストファイル
+# -----------------------------
+# 書き込み側は文字列を CHUNK_SIZE ずつ溜めてキューへ渡すだけ。
+# 圧縮とディスク書き込みは専用スレッドで行うので、取得・書き込みの流れを止めない。
+# キューは容量つきなので、圧縮が追いつかなければ書き込み側が待つ（メモリは一定）。
+
+GZIP = "gzip"
+ZSTD = "zstd"
+COMPRESSION_EXTENSIONS = {GZIP: ".gz", ZSTD: ".zst"}
+DEFAULT_LEVELS = {GZIP: 6, ZSTD: 3}
+
+CHUNK_SIZE = 256 * 1024   # 文字数
+QUEUE_CHUNKS = 8
+
+_DONE = object()
+
+
+def available_compressions():
+    return [GZIP, ZSTD] if zstandard is not None else [GZIP]
+
+
+def resolve_compression(name):
+    """設定値を実際に使う方式へ（空なら None、zstd が無ければ gzip）"""
+    if not name:
+        return None
+    name = name.lower()
+    if name == ZSTD and zstandard is None:
+        return GZIP
+    if name not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"未対応の圧縮方式です: {name}")
+    return name
+
+
+def compression_for_path(path):
+    """拡張子から圧縮方式を判定（圧縮しないファイルは None）"""
+    lower = path.lower()
+    for method, ext in COMPRESSION_EXTENSIONS.items():
+        if lower.endswith(ext):
+            return method
+    return None
+
+
+def _compressor(method, level):
+    if level is None:
+        level = DEFAULT_LEVELS[method]
+    if method == ZSTD:
+        return zstandard.ZstdCompressor(level=level).compressobj()
+    # wbits=31 で gzip 形式。ヘッダの時刻は 0 なので、同じ内容なら同じバイト列になる
+    return zlib.compressobj(level, zlib.DEFLATED, 31)
+
+
+class CompressedTextWriter:
+    """open(path, "w", newline="") の代わりに使える、圧縮つきの書き込み専用テキストファイル
+
+    改行の変換はしない（csv モジュールが書いた \r\n はそのまま）。
+    """
+
+    def __init__(self, path, method=GZIP, level=None, encoding="utf-8"):
+        self.path = path
+        self.method = method
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        self._buf = []
+        self._buf_len = 0
+        self._error = None
+        self._closed = False
+
+        self._raw = open(path, "wb")
+        self._compressor = _compressor(method, level)
+        self._q = queue.Queue(maxsize=QUEUE_CHUNKS)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # -----------------------------
+    # 圧縮スレッド
+    # -----------------------------
+    def _run(self):
+        try:
+            while True:
+                data = self._q.get()
+                if data is _DONE:
+                    break
+                self._raw.write(self._compressor.compress(data))
+            self._raw.write(self._compressor.flush())
+        except Exception as e:
+            self._error = e
+            # 書き込み側が put で止まらないよう、残りを読み捨てる
+            while self._q.get() is not _DONE:
+                pass
+        finally:
+            self._raw.close()
+
+    # -----------------------------
+    # 書き込み側
+    # -----------------------------
+    def write(self, s):
+        if self._error is not None:
+            raise self._error
+        self._buf.append(s)
+        self._buf_len += len(s)
+        if self._buf_len >= CHUNK_SIZE:
+            self._flush_buffer()
+        return len(s)
+
+    def _flush_buffer(self, final=False):
+        data = self._encoder.encode("".join(self._buf), final)
+        self._buf.clear()
+        self._buf_len = 0
+        if data:
+            self._q.put(data)
+
+    def flush(self):
+        pass   # 圧縮の途中で区切ると圧縮率が落ちるので、close() までまとめる
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._flush_buffer(final=True)
+        finally:
+            self._q.put(_DONE)
+            self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
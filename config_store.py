@@ -0,0 +1,168 @@
+import copy
+import json
+import os
+import threading
+
+from atomic_io import atomic_write_json
+
+# -----------------------------
+# 設定の保存先
+# -----------------------------
+APP_DIR_NAME = "SteamAchievementsExport"
+LEGACY_CONFIG_PATH = "config.json"   # 旧バージョンはカレントフォルダに保存していた
+SAVE_DELAY = 0.8                     # 最後の変更からこの秒数だけ静かになったら保存
+DEFAULT_PROFILE = "default"
+
+PROFILE_DEFAULTS = {
+    "api_key": "",
+    "steam_id": "",
+    "output_path": "",
+    "concurrency": 4,
+    "store_dir": "achievement_store",   # 実際の保存先はアカウントごとに <store_dir>/<SteamID64>
+    "schema_cache_dir": "schema_cache",
+    "fetch_rarity": False,        # 全体の取得率も取る（ゲームごとに 1 回多く呼ぶ。キー不要）
+    "compression": "",            # "" / "gzip" / "zstd"（CSV のみ。zstd が無ければ gzip）
+    "compression_level": None,    # None なら方式ごとの既定値
+    "hedge_requests": False,      # 遅い API 呼び出しに 2 本目を送る（hedging 参照）
+    "daily_call_limit": 100000,   # API Key の 1 日の呼び出し上限（Export 前の見積もりに使う）
+}
+
+
+def default_config_path():
+    """ユーザーごとの設定ファイルの場所（Windows は %APPDATA%）"""
+    base = os.environ.get("APPDATA") or os.environ.get("XDG_CONFIG_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_DIR_NAME, "config.json")
+
+
+def _read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+class ConfigStore:
+    """名前付きプロファイルを持つ設定ストア
+
+    update() はメモリ上の値を書き換えるだけで、ファイルへの保存は
+    SAVE_DELAY 秒まとめてから一時ファイル＋os.replace で行う。
+    """
+
+    def __init__(self, path=None, save_delay=SAVE_DELAY):
+        self.path = path or default_config_path()
+        self.save_delay = save_delay
+        self._lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self._data = self._load()
+
+    # -----------------------------
+    # 読み込み
+    # -----------------------------
+    def _load(self):
+        data = _read_json(self.path)
+        if data is None:
+            data = _read_json(LEGACY_CONFIG_PATH) or {}
+
+        # 旧形式（プロファイルなしのフラットな dict）を default に移す
+        if "profiles" not in data:
+            legacy = {k: data[k] for k in PROFILE_DEFAULTS if k in data}
+            data = {"active_profile": DEFAULT_PROFILE, "profiles": {DEFAULT_PROFILE: legacy}}
+
+        profiles = data.setdefault("profiles", {})
+        if not profiles:
+            profiles[DEFAULT_PROFILE] = {}
+        for name, prof in profiles.items():
+            for k, v in PROFILE_DEFAULTS.items():
+                prof.setdefault(k, v)
+        if data.get("active_profile") not in profiles:
+            data["active_profile"] = next(iter(profiles))
+        return data
+
+    # -----------------------------
+    # プロファイル
+    # -----------------------------
+    @property
+    def active_name(self):
+        return self._data["active_profile"]
+
+    def profile_names(self):
+        with self._lock:
+            return list(self._data["profiles"])
+
+    def active(self):
+        """アクティブなプロファイルのコピー"""
+        with self._lock:
+            return dict(self._data["profiles"][self._data["active_profile"]])
+
+    def profile(self, name):
+        """指定プロファイルのコピー（無ければ None）。アクティブは変えない"""
+        with self._lock:
+            prof = self._data["profiles"].get(name)
+            return dict(prof) if prof is not None else None
+
+    def get(self, key, default=None):
+        return self.active().get(key, default)
+
+    def switch(self, name):
+        """プロファイルを切り替える（無ければ現在の内容をコピーして作る）"""
+        with self._lock:
+            profiles = self._data["profiles"]
+            if name not in profiles:
+                current = profiles[self._data["active_profile"]]
+                profiles[name] = copy.deepcopy(current)
+            self._data["active_profile"] = name
+        self._schedule_save()
+        return self.active()
+
+    def delete(self, name):
+        with self._lock:
+            profiles = self._data["profiles"]
+            if name not in profiles or len(profiles) == 1:
+                return
+            del profiles[name]
+            if self._data["active_profile"] == name:
+                self._data["active_profile"] = next(iter(profiles))
+        self._schedule_save()
+
+    def update(self, **values):
+        """アクティブなプロファイルの値を更新（保存は遅延）"""
+        with self._lock:
+            prof = self._data["profiles"][self._data["active_profile"]]
+            changed = False
+            for k, v in values.items():
+                if prof.get(k) != v:
+                    prof[k] = v
+                    changed = True
+        if changed:
+            self._schedule_save()
+
+    # -----------------------------
+    # 保存
+    # -----------------------------
+    def _schedule_save(self):
+        with self._lock:
+            self._dirty = True
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """保留中の変更をすぐに保存する"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+            snapshot = copy.deepcopy(self._data)
+        try:
+            atomic_write_json(self.path, snapshot)
+        except OSError:
+            pass
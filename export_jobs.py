@@ -0,0 +1,136 @@
+import itertools
+import os
+import threading
+
+# -----------------------------
+# Export ジョブのキュー
+# -----------------------------
+# Export ボタンを押すたびに、その時点の選択・形式・出力先でジョブを作って並べる。
+# ジョブは 1 本ずつ順に実行し、HTTP（single-flight）・実績マスタのキャッシュ・
+# AchievementStore は全ジョブで共有する。
+# キューが空になるまでの一続き（バッチ）の間に取得済みの AppID は、
+# 後のジョブでは取り直さず保存済みの結果を使う（ジョブ間の重複を省く）。
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELED = "canceled"
+FAILED = "failed"
+
+STATUS_LABELS = {
+    QUEUED: "待機中",
+    RUNNING: "実行中",
+    DONE: "完了",
+    CANCELED: "中止",
+    FAILED: "失敗",
+}
+
+_job_ids = itertools.count(1)
+
+
+class ExportJob:
+    def __init__(self, selected, output_path, fmt="csv", api_key="", steam_id="",
+                 merge_items=None, offline=False, store=None):
+        self.id = next(_job_ids)
+        self.selected = list(selected)
+        self.output_path = output_path
+        self.fmt = fmt
+        self.api_key = api_key
+        self.steam_id = steam_id
+        self.merge_items = merge_items
+        self.offline = offline
+        self.store = store            # ジョブを作ったときのアカウントの AchievementStore
+
+        self.status = QUEUED
+        self.done = 0
+        self.total = len(self.selected)
+        self.reused = 0           # 前のジョブの取得結果を使った件数
+        self.cancel_event = threading.Event()   # 再試行の待ちもこれで起こす
+
+    @property
+    def cancel_requested(self):
+        return self.cancel_event.is_set()
+
+    @property
+    def finished(self):
+        return self.status in (DONE, CANCELED, FAILED)
+
+    def label(self):
+        kind = "再取得" if self.merge_items is not None else self.fmt.upper()
+        if self.offline:
+            kind += "・オフライン"
+        text = (
+            f"#{self.id} {kind} {os.path.basename(self.output_path)}"
+            f"　{STATUS_LABELS[self.status]} {self.done}/{self.total}"
+        )
+        if self.reused:
+            text += f"（重複 {self.reused} 件は再利用）"
+        return text
+
+
+class JobQueue:
+    def __init__(self):
+        self.jobs = []
+        self._lock = threading.Lock()
+        self._fetched = set()
+
+    def add(self, job):
+        """ジョブを追加し、待機中・実行中のジョブと重なる AppID の数を返す"""
+        with self._lock:
+            pending = set()
+            for j in self.jobs:
+                if not j.finished:
+                    pending.update(a for a, _ in j.selected)
+            self.jobs.append(job)
+        return sum(1 for a, _ in job.selected if a in pending)
+
+    def get(self, job_id):
+        for j in self.jobs:
+            if j.id == job_id:
+                return j
+        return None
+
+    def running(self):
+        for j in self.jobs:
+            if j.status == RUNNING:
+                return j
+        return None
+
+    def next_queued(self):
+        for j in self.jobs:
+            if j.status == QUEUED:
+                return j
+        return None
+
+    def has_pending(self):
+        return any(not j.finished for j in self.jobs)
+
+    def cancel(self, job_id):
+        """待機中なら取り消し、実行中なら中止を要求する。対象のジョブを返す"""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return None
+        if job.status == QUEUED:
+            job.status = CANCELED
+        else:
+            job.cancel_event.set()
+        return job
+
+    def clear_finished(self):
+        self.jobs = [j for j in self.jobs if not j.finished]
+
+    # -----------------------------
+    # バッチ内の重複取得の排除
+    # -----------------------------
+    def mark_fetched(self, appid):
+        with self._lock:
+            self._fetched.add(appid)
+
+    def was_fetched(self, appid):
+        with self._lock:
+            return appid in self._fetched
+
+    def end_batch(self):
+        """キューが空になったら呼ぶ（次のバッチは改めて取得する）"""
+        with self._lock:
+            self._fetched.clear()
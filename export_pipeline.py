@@ -0,0 +1,119 @@
+import queue
+import threading
+
+# -----------------------------
+# Export パイプライン
+# -----------------------------
+# plan → fetch → transform → write の 4 段を容量つきキューでつなぐ。
+# どこかの段が詰まると手前の段は put で待たされる（バックプレッシャー）ので、
+# ジョブがどれだけ大きくてもメモリに載るのは「キュー容量分」だけ。
+#
+#   plan      : 1 スレッド。処理順に項目をキューへ流す
+#   fetch     : concurrency 本のスレッド。API から取得
+#   transform : 1 スレッド。保存・整形（書き込み前の重い処理）
+#   write     : 呼び出し元。run() が返すジェネレータから 1 件ずつ受け取る
+
+_DONE = object()
+QUEUE_FACTOR = 2   # 各キューの容量 = concurrency × QUEUE_FACTOR
+
+
+class ExportPipeline:
+    def __init__(self, fetch, transform=None, concurrency=4, queue_size=None,
+                 should_cancel=None):
+        self.fetch = fetch
+        self.transform = transform or (lambda item, value: value)
+        self.concurrency = max(1, int(concurrency))
+        size = queue_size or self.concurrency * QUEUE_FACTOR
+        self.should_cancel = should_cancel or (lambda: False)
+
+        self._fetch_q = queue.Queue(maxsize=size)
+        self._transform_q = queue.Queue(maxsize=size)
+        self._write_q = queue.Queue(maxsize=size)
+        self._abort = threading.Event()
+
+    # -----------------------------
+    # 状態
+    # -----------------------------
+    def queue_depths(self):
+        """各段の入力キューに溜まっている件数（どこが詰まっているかの目安）"""
+        return {
+            "fetch": self._fetch_q.qsize(),
+            "transform": self._transform_q.qsize(),
+            "write": self._write_q.qsize(),
+        }
+
+    def _stopped(self):
+        return self._abort.is_set() or self.should_cancel()
+
+    # -----------------------------
+    # 各段
+    # -----------------------------
+    def _plan(self, items):
+        try:
+            for item in items:
+                if self._stopped():
+                    break
+                self._fetch_q.put(item)
+        finally:
+            for _ in range(self.concurrency):
+                self._fetch_q.put(_DONE)
+
+    def _fetch(self):
+        while True:
+            item = self._fetch_q.get()
+            if item is _DONE:
+                self._transform_q.put(_DONE)
+                return
+            if self._stopped():
+                continue  # 中止後はキューに残った分を捨てる
+            try:
+                self._transform_q.put((item, self.fetch(item), None))
+            except Exception as e:
+                self._transform_q.put((item, None, e))
+
+    def _transform(self):
+        remaining = self.concurrency
+        while remaining:
+            msg = self._transform_q.get()
+            if msg is _DONE:
+                remaining -= 1
+                continue
+            item, value, error = msg
+            if error is None:
+                try:
+                    value = self.transform(item, value)
+                except Exception as e:
+                    value, error = None, e
+            self._write_q.put((item, value, error))
+        self._write_q.put(_DONE)
+
+    # -----------------------------
+    # 実行
+    # -----------------------------
+    def run(self, items):
+        """(item, value, error) を完了順に返すジェネレータ
+
+        途中で止めた（break / close）場合も、残りを捨てて各スレッドを終わらせる。
+        """
+        threads = [threading.Thread(target=self._plan, args=(items,), daemon=True)]
+        threads += [
+            threading.Thread(target=self._fetch, daemon=True)
+            for _ in range(self.concurrency)
+        ]
+        threads.append(threading.Thread(target=self._transform, daemon=True))
+        for t in threads:
+            t.start()
+
+        try:
+            while True:
+                msg = self._write_q.get()
+                if msg is _DONE:
+                    break
+                yield msg
+        finally:
+            if msg is not _DONE:
+                self._abort.set()
+                while self._write_q.get() is not _DONE:
+                    pass
+            for t in threads:
+                t.join()
@@ -0,0 +1,77 @@
+import os
+import time
+from collections import deque
+
+# -----------------------------
+# Export のスケジューリングと ETA
+# -----------------------------
+# 重いゲーム（実績数の多いゲーム）から先に着手すると、
+# 並列実行の最後に大物だけが残って待たされることが減る。
+# ここで決めるのは取得の順番だけ。出力は選択順（名前順）のまま書く。
+
+
+def estimate_costs(selected, store):
+    """AppID ごとの推定コストを返す
+
+    achievement_store に保存済みのファイルサイズ（≒ 実績マスタの大きさ）を使う。
+    stat だけで済むので、数千件でも中身を読まずに見積もれる。
+    未取得のゲームは既知ゲームの平均サイズとみなす。
+    """
+    costs = {}
+    unknown = []
+    for appid, _name in selected:
+        try:
+            costs[appid] = os.path.getsize(store.path_for(appid))
+        except (OSError, TypeError, ValueError):
+            unknown.append(appid)
+
+    default = (sum(costs.values()) / len(costs)) if costs else 0
+    for appid in unknown:
+        costs[appid] = default
+    return costs
+
+
+def order_longest_first(selected, store):
+    """推定コストの大きい順に並べ替える（同コストなら元の順序）"""
+    costs = estimate_costs(selected, store)
+    return sorted(selected, key=lambda item: -costs[item[0]])
+
+
+class ThroughputMeter:
+    """直近 window 件の完了時刻から処理速度と残り時間を出す"""
+
+    def __init__(self, window=20):
+        self._times = deque(maxlen=window)
+        self._start = time.monotonic()
+
+    def tick(self):
+        self._times.append(time.monotonic())
+
+    def rate(self):
+        """件/秒（まだ計測できなければ 0）"""
+        n = len(self._times)
+        if n == 0:
+            return 0.0
+        if n == 1:
+            span = self._times[0] - self._start
+            return 1.0 / span if span > 0 else 0.0
+        span = self._times[-1] - self._times[0]
+        return (n - 1) / span if span > 0 else 0.0
+
+    def eta(self, remaining):
+        """残り秒数（不明なら None）"""
+        r = self.rate()
+        if r <= 0:
+            return None
+        return remaining / r
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    if h:
+        return f"{h}:{m:02d}:{s:02d}"
+    return f"{m}:{s:02d}"
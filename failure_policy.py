@@ -0,0 +1,184 @@
+import json
+import os
+import time
+
+import requests
+
+from atomic_io import atomic_write_json
+from steam_api import PrivateProfileError
+
+# -----------------------------
+# 失敗の分類
+# -----------------------------
+TIMEOUT = "timeout"
+HTTP_4XX = "http_4xx"
+THROTTLED = "throttled"
+PRIVATE = "private"
+MALFORMED = "malformed"
+OTHER = "other"
+
+FAILURE_LABELS = {
+    TIMEOUT: "タイムアウト／接続エラー",
+    HTTP_4XX: "HTTP 4xx",
+    THROTTLED: "サーバー混雑 (5xx/429)",
+    PRIVATE: "非公開プロフィール",
+    MALFORMED: "不正な JSON",
+    OTHER: "その他",
+}
+
+
+def classify_error(e):
+    if isinstance(e, PrivateProfileError):
+        return PRIVATE
+    if isinstance(e, (requests.Timeout, requests.ConnectionError)):
+        return TIMEOUT
+    if isinstance(e, requests.HTTPError):
+        code = getattr(e.response, "status_code", 0) or 0
+        if code == 429 or code >= 500:
+            return THROTTLED
+        if 400 <= code < 500:
+            return HTTP_4XX
+        return OTHER
+    if isinstance(e, ValueError):   # json.JSONDecodeError もここ
+        return MALFORMED
+    return OTHER
+
+
+# -----------------------------
+# 再試行ポリシー
+# -----------------------------
+class RetryPolicy:
+    def __init__(self, attempts, delay=0.0, backoff=2.0, max_delay=30.0):
+        self.attempts = attempts
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+
+    def wait_for(self, attempt):
+        """attempt 回目の失敗後に待つ秒数"""
+        return min(self.max_delay, self.delay * (self.backoff ** (attempt - 1)))
+
+
+RETRY_POLICIES = {
+    TIMEOUT: RetryPolicy(3, delay=1.0),
+    THROTTLED: RetryPolicy(4, delay=2.0),
+    MALFORMED: RetryPolicy(2, delay=0.5),
+    HTTP_4XX: RetryPolicy(1),   # キーや AppID の問題は再試行しても同じ
+    PRIVATE: RetryPolicy(1),
+    OTHER: RetryPolicy(1),
+}
+
+
+class FetchFailure(Exception):
+    """再試行しても取得できなかった"""
+
+    def __init__(self, category, attempts, cause):
+        super().__init__(f"{FAILURE_LABELS[category]}: {cause}")
+        self.category = category
+        self.attempts = attempts
+        self.cause = cause
+
+
+def _retry_after(e):
+    """429 の Retry-After ヘッダ（秒）"""
+    resp = getattr(e, "response", None)
+    try:
+        return float(resp.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def call_with_retry(fn, policies=RETRY_POLICIES, on_retry=None, should_cancel=None,
+                    sleep=time.sleep, cancel_event=None):
+    """fn() を分類ごとのポリシーで再試行し、最後まで失敗したら FetchFailure
+
+    cancel_event（threading.Event）を渡すと、待っている間にセットされたらすぐやめる。
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            return fn()
+        except Exception as e:
+            category = classify_error(e)
+            policy = policies.get(category, policies[OTHER])
+            if attempt >= policy.attempts or (should_cancel and should_cancel()):
+                raise FetchFailure(category, attempt, e) from e
+
+            delay = _retry_after(e) if category == THROTTLED else None
+            if delay is None:
+                delay = policy.wait_for(attempt)
+            # 大きな Retry-After でもポリシーの上限より長くは待たない
+            delay = max(0.0, min(delay, policy.max_delay))
+            if on_retry:
+                on_retry(category, attempt, policy.attempts, e)
+            if cancel_event is not None:
+                if cancel_event.wait(delay):
+                    raise FetchFailure(category, attempt, e) from e
+            else:
+                sleep(delay)
+            if should_cancel and should_cancel():
+                raise FetchFailure(category, attempt, e) from e
+
+
+# -----------------------------
+# 失敗リスト（dead letter）
+# -----------------------------
+# 出力ファイルの横に <名前>_failed.json として置く。
+# 「失敗分を再取得」はこのファイルの AppID だけを取り直し、出力を作り直す。
+
+
+def dead_letter_path(output_path):
+    stem, _ext = os.path.splitext(output_path)
+    return stem + "_failed.json"
+
+
+def write_dead_letter(output_path, fmt, failed, all_items):
+    """failed: [(appid, name, FetchFailure/Exception)]、all_items: 出力全体の [(appid, name)]"""
+    path = dead_letter_path(output_path)
+    if not failed:
+        if os.path.exists(path):
+            os.remove(path)
+        return None
+
+    now = int(time.time())
+    atomic_write_json(
+        path,
+        {
+            "output_path": output_path,
+            "format": fmt,
+            "failed": [
+                {
+                    "appid": appid,
+                    "name": name,
+                    "category": getattr(err, "category", classify_error(err)),
+                    "attempts": getattr(err, "attempts", 1),
+                    "error": str(err),
+                    "at": now,
+                }
+                for appid, name, err in failed
+            ],
+            "items": [[appid, name] for appid, name in all_items],
+        },
+    )
+    return path
+
+
+def load_dead_letter(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def latest_dead_letter(directory):
+    """フォルダ内で一番新しい *_failed.json のパス（無ければ None）"""
+    try:
+        names = [n for n in os.listdir(directory) if n.endswith("_failed.json")]
+    except OSError:
+        return None
+    if not names:
+        return None
+    paths = [os.path.join(directory, n) for n in names]
+    return max(paths, key=os.path.getmtime)
@@ -0,0 +1,71 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# -----------------------------
+# API 応答の JSON 解析（速い実装があれば使う）
+# -----------------------------
+# orjson → ujson → 標準の json の順に、入っているものを使う。
+# どれも解析に失敗すると ValueError（のサブクラス）を投げるので、
+# failure_policy の分類はそのまま効く。
+
+if orjson is not None:
+    BACKEND = "orjson"
+    _loads = orjson.loads
+elif ujson is not None:
+    BACKEND = "ujson"
+    _loads = ujson.loads
+else:
+    BACKEND = "json"
+    _loads = json.loads
+
+
+def loads(data):
+    """bytes / str を解析する"""
+    return _loads(data)
+
+
+def response_json(resp):
+    """requests の Response を解析する（resp.json() の代わり）
+
+    本文の bytes をそのまま渡すので、文字コードの推測と str への変換を省ける。
+    """
+    if BACKEND == "json":
+        return resp.json()
+    return _loads(resp.content)
+
+
+# -----------------------------
+# 使う項目だけを取り出す
+# -----------------------------
+# 応答には使わない項目も多い（画像 URL、プラットフォーム別のプレイ時間など）。
+# 保存・キャッシュ・共有する前に必要な項目だけにして、メモリと書き込み量を減らす。
+
+OWNED_GAME_FIELDS = (
+    "appid",
+    "name",
+    "playtime_forever",
+    "rtime_last_played",
+    "has_community_visible_stats",
+)
+SCHEMA_FIELDS = ("name", "displayName", "description", "icon", "icongray")
+
+
+def _pick(d, fields):
+    return {k: d[k] for k in fields if k in d}
+
+
+def slim_owned_games(games):
+    return [_pick(g, OWNED_GAME_FIELDS) for g in games]
+
+
+def slim_schema(achievements):
+    return [_pick(a, SCHEMA_FIELDS) for a in achievements]
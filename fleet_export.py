@@ -0,0 +1,303 @@
+"""複数アカウントの一括 Export（プロセス並列）
+
+  python fleet_export.py --accounts accounts.json --output fleet.csv [--workers N]
+  python fleet_export.py --profiles a,b,c --output fleet.csv.gz [--level N]
+
+accounts.json は [{"name": "...", "api_key": "...", "steam_id": "..."}, ...]。
+--profiles を使うと設定のプロファイルをアカウントとして使う（"*" で全部）。
+圧縮は --output の拡張子で決まる（.csv.gz は gzip、.csv.zst は zstd）。
+
+アカウントをプロセスプールに振り分け、各プロセスは自分の HTTP 接続プールで取得して
+アカウントごとの CSV（シャード）を書く。JSON の解析や行の組み立てがプロセスごとに
+並列になるので、GIL に縛られずコア数に応じて速くなる。
+実績マスタのキャッシュ（schema_cache）はディスク上で全プロセスが共有する。
+最後にシャードを順番に流し込んで 1 つの出力にまとめる（全体をメモリに載せない）。
+STEAM_MEMPROFILE=1 を付けると、各ワーカーがアカウントごとのメモリ使用量を出す。
+"""
+import argparse
+import json
+import multiprocessing.util
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from api_quota import CallCounter, QuotaLedger
+from atomic_io import atomic_output
+from compressed_io import CompressedTextWriter, compression_for_path, resolve_compression
+from config_store import ConfigStore
+from export_pipeline import ExportPipeline
+from failure_policy import call_with_retry
+from http_cassette import RECORD, install_from_env, merge_worker_cassettes
+from memory_profile import profiler_from_env
+from report_writers import CsvReportWriter
+from schema_cache import SCHEMA_CACHE_DIR, SchemaCache
+from steam_api import (
+    fetch_game_record,
+    get_owned_games,
+    set_quota_ledger,
+    set_schema_cache,
+    set_transport,
+)
+
+ACCOUNT_FIELD = "アカウント"
+FLEET_CONCURRENCY = 4      # 1 プロセスあたりの同時リクエスト数
+MERGE_CHUNK = 1 << 20
+
+
+def load_accounts(path):
+    with open(path, "r", encoding="utf-8") as f:
+        accounts = json.load(f)
+    return [a for a in accounts if a.get("api_key") and a.get("steam_id")]
+
+
+def accounts_from_profiles(config, names):
+    """プロファイルをアカウントとして使う（names が ["*"] なら全部）"""
+    if names == ["*"]:
+        names = config.profile_names()
+    accounts = []
+    for name in names:
+        prof = config.profile(name)
+        if prof and prof.get("api_key") and prof.get("steam_id"):
+            accounts.append({"name": name, "api_key": prof["api_key"], "steam_id": prof["steam_id"]})
+    return accounts
+
+
+# -----------------------------
+# ワーカープロセス
+# -----------------------------
+_memprof = None
+_calls = None   # ワーカーでの API 呼び出し数（親の QuotaLedger へ渡す）
+
+
+def _init_worker(schema_cache_dir, concurrency):
+    """プロセスごとに HTTP 接続プールとキャッシュを用意する"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(1, concurrency))
+    session.mount("https://", adapter)
+    set_transport(session.get)
+    set_schema_cache(SchemaCache(schema_cache_dir))
+    global _calls
+    _calls = CallCounter()
+    set_quota_ledger(_calls)
+    # STEAM_CASSETTE があればワーカーでも記録・再生する。
+    # 記録はプロセスごとの別ファイルへ（最後に run_fleet がまとめる）。プロセス終了時に閉じる
+    cassette = install_from_env(get=session.get, worker=True)
+    if cassette is not None:
+        multiprocessing.util.Finalize(None, cassette.close, exitpriority=10)
+    global _memprof
+    _memprof = profiler_from_env(log=lambda msg: print(f"[pid {os.getpid()}] {msg}", flush=True))
+
+
+def _account_name(account):
+    return account.get("name") or account["steam_id"]
+
+
+def _new_result(index, account, error=None):
+    return {"index": index, "name": _account_name(account), "shard": None, "games": 0,
+            "rows": 0, "failed": 0, "skipped": 0, "calls": 0, "elapsed": 0.0, "error": error}
+
+
+def export_account(index, account, shard_dir, concurrency=FLEET_CONCURRENCY, with_rarity=False):
+    """1 アカウント分をシャード CSV に書き、結果の要約を返す（失敗は result["error"] に入れる）"""
+    api_key = account["api_key"]
+    t0 = time.perf_counter()
+    result = _new_result(index, account)
+    try:
+        _export_account(result, account, shard_dir, concurrency, with_rarity)
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+        result["shard"] = None   # 途中までのシャードは結合しない
+    if _calls is not None:
+        result["calls"] = _calls.take(api_key)
+    result["elapsed"] = time.perf_counter() - t0
+    return result
+
+
+def _export_account(result, account, shard_dir, concurrency, with_rarity):
+    name = result["name"]
+    index = result["index"]
+    api_key = account["api_key"]
+    steam_id = account["steam_id"]
+
+    games = call_with_retry(lambda: get_owned_games(api_key, steam_id))
+    games.sort(key=lambda g: g.get("name", "").lower())
+    result["games"] = len(games)
+    if _memprof is not None:
+        _memprof.checkpoint(f"{name} 一覧取得", games=len(games))
+
+    shard = os.path.join(shard_dir, f"shard_{index:05d}.csv")
+    writer = CsvReportWriter(shard, fixed={ACCOUNT_FIELD: name})
+    pipeline = ExportPipeline(
+        fetch=lambda item: call_with_retry(
+            lambda: fetch_game_record(
+                api_key, steam_id, item[1].get("appid"), with_rarity=with_rarity
+            )
+        ),
+        concurrency=concurrency,
+    )
+    # 取得は完了順に返ってくるので、名前順に並べ直してから書く
+    # （毎回同じバイト列になり、skip_unchanged が効く）
+    pending = {}
+    next_index = 0
+    try:
+        for (i, g), rec, error in pipeline.run(list(enumerate(games))):
+            if error is not None:
+                result["failed"] += 1
+                rec = None
+            elif rec["achievements"] is None or rec["status"] is None:
+                result["skipped"] += 1
+                rec = None
+            pending[i] = (g, rec)
+            while next_index in pending:
+                g, rec = pending.pop(next_index)
+                next_index += 1
+                if rec is not None:
+                    writer.write_game(
+                        g.get("appid"),
+                        rec["game_name"] or g.get("name"),
+                        rec["achievements"],
+                        rec["status"],
+                    )
+    finally:
+        writer.close()
+    if _memprof is not None:
+        _memprof.checkpoint(f"{name} 取得・書き出し", rows=writer.rows)
+
+    result["shard"] = shard
+    result["rows"] = writer.rows
+
+
+# -----------------------------
+# シャードの結合
+# -----------------------------
+def merge_shards(shards, path, compression=None, level=None):
+    """シャード CSV を順番につなげる（見出し行は最初の 1 回だけ）"""
+    if compression:
+        out = CompressedTextWriter(path, compression, level, encoding="utf-8-sig")
+    else:
+        out = open(path, "w", newline="", encoding="utf-8-sig")
+    wrote_header = False
+    try:
+        for shard in shards:
+            with open(shard, "r", newline="", encoding="utf-8-sig") as f:
+                header = f.readline()
+                if not wrote_header:
+                    out.write(header)
+                    wrote_header = True
+                shutil.copyfileobj(f, out, MERGE_CHUNK)
+    finally:
+        out.close()
+
+
+def run_fleet(accounts, output_path, workers=None, concurrency=FLEET_CONCURRENCY,
+              schema_cache_dir=SCHEMA_CACHE_DIR, level=None, with_rarity=False, ledger=None,
+              log=print):
+    """accounts をプロセス並列で取得し、output_path に 1 つにまとめる。各アカウントの要約を返す
+
+    ledger（QuotaLedger）を渡すと、ワーカーでの API 呼び出し数をキーごとに記録する。
+    1 アカウントの失敗（ワーカーの異常終了を含む）は、そのアカウントの error に入れて続ける。
+    """
+    compression = compression_for_path(output_path)
+    out_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(out_dir, exist_ok=True)
+    shard_dir = tempfile.mkdtemp(prefix=".fleet-", dir=out_dir)
+    results = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(schema_cache_dir, concurrency),
+        ) as pool:
+            futures = {
+                pool.submit(export_account, i, a, shard_dir, concurrency, with_rarity): i
+                for i, a in enumerate(accounts)
+            }
+            for n, fut in enumerate(as_completed(futures), 1):
+                i = futures[fut]
+                try:
+                    r = fut.result()
+                except Exception as e:   # BrokenProcessPool など
+                    r = _new_result(i, accounts[i], f"{type(e).__name__}: {e}")
+                results.append(r)
+                if ledger is not None and r["calls"]:
+                    ledger.record(accounts[i]["api_key"], r["calls"])
+                if r["error"]:
+                    log(f"[{n}/{len(accounts)}] {r['name']}: エラー: {r['error']}")
+                else:
+                    log(
+                        f"[{n}/{len(accounts)}] {r['name']}: {r['games']} ゲーム / {r['rows']} 行"
+                        f"（失敗 {r['failed']}）{r['elapsed']:.1f} 秒"
+                    )
+
+        results.sort(key=lambda r: r["index"])
+        shards = [r["shard"] for r in results if r["shard"] and r["rows"]]
+        if shards:
+            out = atomic_output(output_path, skip_unchanged=True)
+            with out as tmp_path:
+                merge_shards(shards, tmp_path, compression, level)
+            log(f"出力 → {output_path}" if out.changed else f"変更なし → {output_path}")
+        else:
+            log("出力する実績がありません。")
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+        if os.environ.get("STEAM_CASSETTE") and os.environ.get("STEAM_CASSETTE_MODE") == RECORD:
+            merge_worker_cassettes(os.environ["STEAM_CASSETTE"])
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="複数アカウントの Steam 実績を一括 Export")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--accounts", help="アカウント一覧の JSON")
+    src.add_argument("--profiles", help="カンマ区切りのプロファイル名（* で全部）")
+    parser.add_argument("--config", default=None, help="設定ファイル（--profiles 用）")
+    parser.add_argument("--output", required=True, help="出力 CSV（.csv.gz / .csv.zst で圧縮）")
+    parser.add_argument("--workers", type=int, default=None, help="プロセス数（既定は CPU 数）")
+    parser.add_argument("--concurrency", type=int, default=FLEET_CONCURRENCY)
+    parser.add_argument("--schema-cache", default=SCHEMA_CACHE_DIR)
+    parser.add_argument("--level", type=int, default=None, help="圧縮レベル")
+    parser.add_argument("--rarity", action="store_true", help="全体の取得率も取る")
+    args = parser.parse_args(argv)
+
+    if args.accounts:
+        accounts = load_accounts(args.accounts)
+    else:
+        names = [n.strip() for n in args.profiles.split(",") if n.strip()]
+        accounts = accounts_from_profiles(ConfigStore(args.config), names)
+    if not accounts:
+        parser.error("API Key と SteamID64 のそろったアカウントがありません。")
+
+    compression = compression_for_path(args.output)
+    if compression and resolve_compression(compression) != compression:
+        parser.error(f"{compression} が使えません（zstandard が未インストール）。")
+
+    ledger = QuotaLedger()
+    t0 = time.perf_counter()
+    try:
+        results = run_fleet(
+            accounts,
+            args.output,
+            workers=args.workers,
+            concurrency=args.concurrency,
+            schema_cache_dir=args.schema_cache,
+            level=args.level,
+            with_rarity=args.rarity,
+            ledger=ledger,
+        )
+    finally:
+        ledger.flush()
+    rows = sum(r["rows"] for r in results)
+    errors = sum(1 for r in results if r["error"])
+    print(
+        f"アカウント {len(results)}（エラー {errors}）/ {rows} 行 / "
+        f"{time.perf_counter() - t0:.1f} 秒"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import time
+from bisect import bisect_left, bisect_right
+
+# -----------------------------
+# 所有ゲームの絞り込み（ファセット検索）
+# -----------------------------
+# 数値の条件ごとに (値, AppID) をソート済みで持っておき、範囲は bisect で切り出す。
+# 条件の組み合わせは小さい集合から順に積集合を取るだけなので、2 万件でも数 ms。
+
+DAY = 86400
+
+
+class _SortedFacet:
+    def __init__(self, pairs):
+        pairs = sorted(pairs)
+        self.keys = [k for k, _ in pairs]
+        self.ids = [a for _, a in pairs]
+
+    def range(self, lo=None, hi=None):
+        i = 0 if lo is None else bisect_left(self.keys, lo)
+        j = len(self.keys) if hi is None else bisect_right(self.keys, hi)
+        return self.ids[i:j]
+
+
+class GameIndex:
+    """owned games と保存済みの要約（AchievementStore.summary()）から作る索引"""
+
+    def __init__(self, games, completion=None):
+        completion = completion or {}
+        self.all_appids = frozenset(g.get("appid") for g in games)
+
+        self._playtime = _SortedFacet(
+            (g.get("playtime_forever", 0) or 0, g.get("appid")) for g in games
+        )
+        self._last_played = _SortedFacet(
+            (g.get("rtime_last_played", 0) or 0, g.get("appid")) for g in games
+        )
+
+        pct_pairs = []
+        has_stats = set()
+        no_stats = set()
+        for g in games:
+            appid = g.get("appid")
+            summ = completion.get(appid)
+            if summ is not None:
+                total = summ.get("total")
+                if total:
+                    has_stats.add(appid)
+                    pct_pairs.append((summ.get("unlocked", 0) / total * 100.0, appid))
+                else:
+                    no_stats.add(appid)
+            elif g.get("has_community_visible_stats"):
+                has_stats.add(appid)
+            else:
+                no_stats.add(appid)
+
+        self._completion = _SortedFacet(pct_pairs)
+        self._has_stats = frozenset(has_stats)
+        self._no_stats = frozenset(no_stats)
+
+    def query(
+        self,
+        playtime_min=None,
+        playtime_max=None,
+        played_within_days=None,
+        has_stats=None,
+        completion_min=None,
+        completion_max=None,
+        now=None,
+    ):
+        """条件に合う AppID の集合を返す（条件なしなら全件）
+
+        playtime_* は分単位（GetOwnedGames の playtime_forever と同じ）、
+        completion_* は 0〜100 の達成率。達成率は取得済みのゲームだけが対象。
+        """
+        parts = []
+        if playtime_min is not None or playtime_max is not None:
+            parts.append(self._playtime.range(playtime_min, playtime_max))
+        if played_within_days is not None:
+            now = time.time() if now is None else now
+            parts.append(self._last_played.range(now - played_within_days * DAY, None))
+        if completion_min is not None or completion_max is not None:
+            parts.append(self._completion.range(completion_min, completion_max))
+        if has_stats is not None:
+            parts.append(self._has_stats if has_stats else self._no_stats)
+
+        if not parts:
+            return self.all_appids
+
+        parts.sort(key=len)
+        result = set(parts[0])
+        for p in parts[1:]:
+            if not result:
+                break
+            result.intersection_update(p)
+        return result
@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from collections import deque
+
+# -----------------------------
+# ヘッジリクエスト（遅い呼び出しの保険）
+# -----------------------------
+# 最近の所要時間の p95 を過ぎても応答が無ければ、同じリクエストをもう 1 本送り、
+# 先に返ってきた方を使う。遅れた方の結果は捨てる（requests は途中で止められないので、
+# 通信自体はタイムアウトまで裏で続く）。
+# 追加で送る本数は「呼び出し数 × max_extra_ratio」までに抑え、API の上限を守る。
+
+HEDGE_QUANTILE = 0.95
+MAX_EXTRA_RATIO = 0.05
+MIN_HEDGE_DELAY = 0.3    # 秒。これより早くはヘッジしない
+MIN_SAMPLES = 20         # 所要時間がこれだけ溜まるまではヘッジしない
+
+
+class LatencyWindow:
+    """直近 size 件の所要時間（秒）"""
+
+    def __init__(self, size=200):
+        self._values = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._values.append(seconds)
+
+    def __len__(self):
+        return len(self._values)
+
+    def quantile(self, q):
+        with self._lock:
+            values = sorted(self._values)
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class Hedger:
+    def __init__(self, quantile=HEDGE_QUANTILE, max_extra_ratio=MAX_EXTRA_RATIO,
+                 min_delay=MIN_HEDGE_DELAY, min_samples=MIN_SAMPLES, enabled=False):
+        self.quantile = quantile
+        self.max_extra_ratio = max_extra_ratio
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.enabled = enabled
+        self.latency = LatencyWindow()
+
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self):
+        """ヘッジを送るまでの待ち時間（まだ判断できなければ None）"""
+        p = self.latency.quantile(self.quantile)
+        if p is None or len(self.latency) < self.min_samples:
+            return None
+        return max(self.min_delay, p)
+
+    def _take_budget(self):
+        with self._lock:
+            if self.hedged + 1 > self.calls * self.max_extra_ratio:
+                return False
+            self.hedged += 1
+            return True
+
+    def _attempt(self, fn, results, tag):
+        t0 = time.perf_counter()
+        try:
+            value = fn()
+        except Exception as e:
+            # タイムアウトなどの失敗も所要時間に入れる（入れないと p95 が実際より短くなる）
+            self.latency.add(time.perf_counter() - t0)
+            results.put((tag, False, e))
+            return
+        self.latency.add(time.perf_counter() - t0)
+        results.put((tag, True, value))
+
+    def call(self, fn):
+        """fn() を実行する。遅ければ 2 本目を送り、先に成功した方の結果を返す"""
+        with self._lock:
+            self.calls += 1
+
+        delay = self.hedge_delay() if self.enabled else None
+        if delay is None:
+            t0 = time.perf_counter()
+            try:
+                return fn()
+            finally:
+                self.latency.add(time.perf_counter() - t0)
+
+        results = queue.Queue()
+        threading.Thread(target=self._attempt, args=(fn, results, 0), daemon=True).start()
+        pending = 1
+        try:
+            msg = results.get(timeout=delay)
+        except queue.Empty:
+            if self._take_budget():
+                threading.Thread(
+                    target=self._attempt, args=(fn, results, 1), daemon=True
+                ).start()
+                pending += 1
+            msg = results.get()
+
+        # 片方が失敗しても、もう片方がまだ走っていればそちらを待つ
+        first_error = None
+        while True:
+            pending -= 1
+            tag, ok, value = msg
+            if ok:
+                if tag == 1:
+                    with self._lock:
+                        self.hedge_wins += 1
+                return value
+            if first_error is None:
+                first_error = value
+            if not pending:
+                raise first_error
+            msg = results.get()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "p95": self.latency.quantile(self.quantile),
+            }
+
+
+def stats_since(before, after):
+    """stats() 2 回分の差（その間の呼び出し・ヘッジの数。p95 は after のもの）"""
+    return {
+        "calls": after["calls"] - before["calls"],
+        "hedged": after["hedged"] - before["hedged"],
+        "hedge_wins": after["hedge_wins"] - before["hedge_wins"],
+        "p95": after["p95"],
+    }
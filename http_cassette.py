@@ -0,0 +1,210 @@
+"""HTTP の記録・再生（カセット）
+
+  記録: STEAM_CASSETTE=export.cassette.gz STEAM_CASSETTE_MODE=record python steam_achievements_export.py
+  再生: STEAM_CASSETTE=export.cassette.gz python steam_achievements_export.py
+
+記録モードでは Steam API への GET を 1 件 1 行（JSON Lines、.gz なら gzip）で残す。
+再生モードはネットワークに出ず、記録した応答をそのまま返す。
+timing を指定すると、記録時の所要時間 × timing だけ待ってから返す（遅い環境の再現用）。
+URL の API Key は記録時に伏せるので、カセットを人に渡しても鍵は漏れない。
+"""
+import glob
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import steam_api
+
+RECORD = "record"
+REPLAY = "replay"
+
+_KEY_RE = re.compile(r"([?&]key=)[^&]*")
+_KEPT_HEADERS = ("Content-Type", "Retry-After")
+
+
+class CassetteMiss(LookupError):
+    """再生中、カセットに無いリクエストが来た"""
+
+
+def normalize_url(url):
+    """API Key を伏せた URL（記録と照合のキー）"""
+    return _KEY_RE.sub(r"\1-", url)
+
+
+def _open(path, mode):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+# -----------------------------
+# 記録
+# -----------------------------
+class CassetteRecorder:
+    """本物の通信を行い、リクエストと応答をカセットへ追記する"""
+
+    def __init__(self, path, get=requests.get):
+        self.path = path
+        self._get = get
+        self._lock = threading.Lock()
+        self._f = _open(path, "w")
+
+    def _write(self, entry):
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._f.write(line)
+
+    def get(self, url, timeout=None):
+        t0 = time.perf_counter()
+        entry = {"url": normalize_url(url)}
+        try:
+            resp = self._get(url, timeout=timeout)
+        except requests.Timeout as e:
+            entry.update(elapsed=round(time.perf_counter() - t0, 4), error="timeout", message=str(e))
+            self._write(entry)
+            raise
+        except requests.ConnectionError as e:
+            entry.update(elapsed=round(time.perf_counter() - t0, 4), error="connection", message=str(e))
+            self._write(entry)
+            raise
+
+        entry.update(
+            elapsed=round(time.perf_counter() - t0, 4),
+            status=resp.status_code,
+            headers={k: resp.headers[k] for k in _KEPT_HEADERS if k in resp.headers},
+            body=resp.text,
+        )
+        self._write(entry)
+        return resp
+
+    def close(self):
+        with self._lock:
+            self._f.close()
+
+
+# -----------------------------
+# 再生
+# -----------------------------
+def _make_response(entry):
+    resp = requests.Response()
+    resp.status_code = entry["status"]
+    resp.headers = CaseInsensitiveDict(entry.get("headers") or {})
+    resp._content = entry.get("body", "").encode("utf-8")
+    resp.encoding = "utf-8"
+    resp.url = entry["url"]
+    return resp
+
+
+class CassettePlayer:
+    """カセットの応答を返す（ネットワークには出ない）
+
+    同じ URL が複数回記録されていれば記録順に返し、尽きたら最後の応答を返し続ける。
+    timing=0 なら待たない。1.0 なら記録時と同じ時間、2.0 なら倍の時間待つ。
+    """
+
+    def __init__(self, path, timing=0.0, sleep=time.sleep):
+        self.path = path
+        self.timing = timing
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._entries = defaultdict(deque)
+        with _open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self._entries[entry["url"]].append(entry)
+
+    def _next(self, url):
+        with self._lock:
+            q = self._entries.get(normalize_url(url))
+            if not q:
+                raise CassetteMiss(f"カセットに記録がありません: {normalize_url(url)}")
+            return q.popleft() if len(q) > 1 else q[0]
+
+    def get(self, url, timeout=None):
+        entry = self._next(url)
+        if self.timing:
+            self._sleep(entry.get("elapsed", 0.0) * self.timing)
+
+        error = entry.get("error")
+        if error == "timeout":
+            raise requests.Timeout(entry.get("message", ""))
+        if error == "connection":
+            raise requests.ConnectionError(entry.get("message", ""))
+        return _make_response(entry)
+
+    def close(self):
+        pass
+
+
+# -----------------------------
+# 差し込み
+# -----------------------------
+@contextmanager
+def use_cassette(path, mode=REPLAY, timing=0.0):
+    """with の間、steam_api の通信をカセット経由にする"""
+    cassette = CassetteRecorder(path) if mode == RECORD else CassettePlayer(path, timing)
+    prev = steam_api.set_transport(cassette.get, counted=mode == RECORD)
+    try:
+        yield cassette
+    finally:
+        steam_api.set_transport(prev)
+        cassette.close()
+
+
+def worker_cassette_path(path, pid=None):
+    """ワーカープロセスごとの記録先（x.cassette.gz → x.cassette.<pid>.gz。.gz は残す）"""
+    pid = os.getpid() if pid is None else pid
+    if path.endswith(".gz"):
+        return f"{path[:-3]}.{pid}.gz"
+    return f"{path}.{pid}"
+
+
+def _worker_cassette_pattern(path):
+    return worker_cassette_path(glob.escape(path), "[0-9]*")
+
+
+def merge_worker_cassettes(path):
+    """ワーカーごとの記録を path に 1 本にまとめ、元のファイルを消す。まとめた数を返す"""
+    parts = sorted(glob.glob(_worker_cassette_pattern(path)))
+    if not parts:
+        return 0
+    with _open(path, "w") as out:
+        for part in parts:
+            with _open(part, "r") as f:
+                shutil.copyfileobj(f, out)
+    for part in parts:
+        os.remove(part)
+    return len(parts)
+
+
+def install_from_env(environ=os.environ, get=None, worker=False):
+    """環境変数 STEAM_CASSETTE / STEAM_CASSETTE_MODE / STEAM_CASSETTE_TIMING を見て差し込む
+
+    差し込んだカセットを返す（設定が無ければ None）。記録モードは終了時に close() すること。
+    get は記録モードで本物の通信に使う関数（省略時は requests.get）。
+    worker=True なら記録先をプロセスごとのファイルにする（merge_worker_cassettes でまとめる）。
+    """
+    path = environ.get("STEAM_CASSETTE")
+    if not path:
+        return None
+    mode = environ.get("STEAM_CASSETTE_MODE", REPLAY)
+    if mode == RECORD:
+        if worker:
+            path = worker_cassette_path(path)
+        cassette = CassetteRecorder(path, get=get or requests.get)
+    else:
+        cassette = CassettePlayer(path, float(environ.get("STEAM_CASSETTE_TIMING", 0) or 0))
+    # 再生は Steam を呼ばないので、1 日の呼び出し数に数えない
+    steam_api.set_transport(cassette.get, counted=mode == RECORD)
+    return cassette
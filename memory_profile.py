@@ -0,0 +1,108 @@
+import os
+import threading
+import tracemalloc
+
+# -----------------------------
+# メモリの計測（tracemalloc）
+# -----------------------------
+# STEAM_MEMPROFILE=1（数字なら表示する件数）で有効にする。sync_daemon は --memprofile でもよい。
+# Export の各段階（一覧取得・取得と書き出し・完了など）でスナップショットを取り、
+#   - その時点の使用量と、それまでのピーク
+#   - 前の段階から増えた分の多い行（どこで確保したか）
+# をログに出す。無効のときは checkpoint() は何もしない。
+
+MEMPROFILE_ENV = "STEAM_MEMPROFILE"
+TOP_N = 10
+TRACE_FRAMES = 1
+
+_IGNORED = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _mb(n):
+    return n / 2**20
+
+
+class Checkpoint:
+    def __init__(self, stage, current, peak, top, counts):
+        self.stage = stage
+        self.current = current      # bytes
+        self.peak = peak            # bytes（計測開始からのピーク）
+        self.top = top              # [(場所, 増えた bytes, 確保数)]
+        self.counts = counts        # {名前: 件数}（ゲーム数・行数などの目安）
+
+
+class MemoryProfiler:
+    def __init__(self, enabled=False, top=TOP_N, frames=TRACE_FRAMES, log=print):
+        self.enabled = enabled
+        self.top = top
+        self.frames = frames
+        self.log = log
+        self.checkpoints = []
+        self._prev = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        if self.enabled and not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        return self
+
+    def stop(self):
+        if self.enabled and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._prev = None
+
+    def checkpoint(self, stage, **counts):
+        """stage の時点の使用量と、前の段階から増えた分の多い場所を記録・表示する"""
+        if not self.enabled or not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            snap = tracemalloc.take_snapshot().filter_traces(_IGNORED)
+            current, peak = tracemalloc.get_traced_memory()
+            if self._prev is None:
+                stats = [(s.traceback, s.size, s.count) for s in snap.statistics("lineno")]
+            else:
+                stats = [
+                    (s.traceback, s.size_diff, s.count_diff)
+                    for s in snap.compare_to(self._prev, "lineno")
+                ]
+            self._prev = snap
+
+        stats.sort(key=lambda s: -s[1])
+        top = [
+            (f"{os.path.basename(tb[0].filename)}:{tb[0].lineno}", size, count)
+            for tb, size, count in stats[: self.top]
+            if size > 0
+        ]
+        cp = Checkpoint(stage, current, peak, top, counts)
+        self.checkpoints.append(cp)
+        self._log_checkpoint(cp)
+        return cp
+
+    def _log_checkpoint(self, cp):
+        line = f"[メモリ] {cp.stage}: 使用 {_mb(cp.current):.1f} MB / ピーク {_mb(cp.peak):.1f} MB"
+        if cp.counts:
+            line += "（" + ", ".join(f"{k} {v}" for k, v in cp.counts.items()) + "）"
+        self.log(line)
+        for where, size, count in cp.top:
+            self.log(f"    +{_mb(size):7.2f} MB  {count:>8} 個  {where}")
+
+    @property
+    def peak(self):
+        """計測開始からのピーク（bytes）"""
+        if not tracemalloc.is_tracing():
+            return max((cp.peak for cp in self.checkpoints), default=0)
+        return tracemalloc.get_traced_memory()[1]
+
+
+def profiler_from_env(environ=os.environ, log=print):
+    """STEAM_MEMPROFILE を見て MemoryProfiler を作る（未設定なら無効のもの）"""
+    value = environ.get(MEMPROFILE_ENV, "")
+    if not value or value == "0":
+        return MemoryProfiler(enabled=False, log=log)
+    top = int(value) if value.isdigit() and int(value) > 1 else TOP_N
+    return MemoryProfiler(enabled=True, top=top, log=log).start()
@@ -0,0 +1,303 @@
+import csv
+import html
+import os
+import re
+import time
+
+from compressed_io import CompressedTextWriter, COMPRESSION_EXTENSIONS
+
+# -----------------------------
+# 出力ライター
+# -----------------------------
+# どのライターも 1 ゲーム分ずつ write_game() で受け取り、その場で書き出す。
+# ライブラリ全体をメモリに溜めないので、ゲーム数に関係なく使用メモリは一定。
+
+CSV_FIELDS = ["ゲーム名", "実績名", "説明", "取得状況"]
+FRESHNESS_FIELD = "取得日時"   # オフライン出力で、その行のデータをいつ取得したか
+
+# HTML レポート 1 ページあたりのゲーム数（これを超えたら次のページへ）
+HTML_GAMES_PER_PAGE = 200
+
+# カラー（アプリ本体と揃える）
+_HTML_BG_ROOT = "#232120"
+_HTML_BG_PANEL = "#32302F"
+_HTML_FG_MAIN = "#e5e7eb"
+_HTML_FG_SUB = "#9ca3af"
+
+
+def achieved_mark(status, api_name):
+    """取得済みなら ✅、未取得なら ❌"""
+    return "✅" if status.get(api_name) == 1 else "❌"
+
+
+def format_fetched_at(ts):
+    """取得日時（UNIX 秒）を表示用の文字列に"""
+    if not ts:
+        return ""
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(ts))
+
+
+class CsvReportWriter:
+    """CSV ライター（1 行ずつ逐次書き込み）
+
+    compression を指定すると圧縮しながら書く（.csv.gz / .csv.zst、圧縮は別スレッド）。
+    fixed は全行の先頭に付ける固定列（複数アカウントをまとめる出力の「アカウント」など）。
+    """
+
+    def __init__(self, path, with_freshness=False, compression=None, level=None, fixed=None):
+        self.path = path
+        self.rows = 0
+        self.with_freshness = with_freshness
+        self.fixed = dict(fixed or {})
+        fields = list(self.fixed) + CSV_FIELDS
+        if with_freshness:
+            fields.append(FRESHNESS_FIELD)
+        if compression:
+            self._f = CompressedTextWriter(path, compression, level, encoding="utf-8-sig")
+        else:
+            self._f = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._f, fieldnames=fields)
+        self._writer.writeheader()
+
+    def write_game(self, appid, game_name, achievements, status, fetched_at=None):
+        fetched = format_fetched_at(fetched_at) if self.with_freshness else None
+        for a in achievements:
+            api = a.get("name")
+            row = {
+                **self.fixed,
+                "ゲーム名": game_name,
+                "実績名": a.get("displayName", ""),
+                "説明": a.get("description", ""),
+                "取得状況": achieved_mark(status, api),
+            }
+            if fetched is not None:
+                row[FRESHNESS_FIELD] = fetched
+            self._writer.writerow(row)
+            self.rows += 1
+
+    def close(self):
+        self._f.close()
+
+
+class HtmlReportWriter:
+    """静的 HTML レポート（ゲーム単位で逐次書き込み）
+
+    path には目次ページを書き、ゲームごとのセクションは
+    HTML_GAMES_PER_PAGE 件ずつ「<名前>_p001.html」… に分割して書く。
+    目次も 1 ゲームごとに追記するので、保持するのは集計用のカウンタだけ。
+    前回より少ないページ数で書いたときの余りは、AtomicOutput の prune（report_pages_pattern）で消す。
+    """
+
+    def __init__(self, path, include_icons=True, games_per_page=HTML_GAMES_PER_PAGE,
+                 title="Steam 実績レポート", with_freshness=False):
+        self.path = path
+        self.with_freshness = with_freshness
+        self.include_icons = include_icons
+        self.games_per_page = max(1, int(games_per_page))
+        self.title = title
+        self.rows = 0
+
+        self._dir = os.path.dirname(path)
+        self._stem = os.path.splitext(os.path.basename(path))[0]
+
+        self._page_no = 0
+        self._page_games = 0
+        self._page = None
+        self._top_nav_at = 0
+
+        # 全体集計（定数メモリ）
+        self._games = 0
+        self._unlocked = 0
+        self._total = 0
+
+        self._index = open(path, "w", encoding="utf-8")
+        self._index.write(self._head(title))
+        self._index.write(
+            f"<h1>{html.escape(title)}</h1>\n"
+            "<table class=\"index\">\n"
+            "<tr><th>ゲーム</th><th>取得数</th><th>達成率</th></tr>\n"
+        )
+
+    # -----------------------------
+    # ページ管理
+    # -----------------------------
+    def _page_name(self, no):
+        return f"{self._stem}_p{no:03d}.html"
+
+    def _head(self, title):
+        return (
+            "<!DOCTYPE html>\n<html lang=\"ja\">\n<head>\n<meta charset=\"utf-8\">\n"
+            f"<title>{html.escape(title)}</title>\n"
+            "<style>\n"
+            f"body{{background:{_HTML_BG_ROOT};color:{_HTML_FG_MAIN};"
+            "font-family:'Noto Sans JP',sans-serif;margin:24px;}\n"
+            f"section{{background:{_HTML_BG_PANEL};border-radius:12px;"
+            "padding:12px 16px;margin:0 0 16px;}\n"
+            "table{border-collapse:collapse;width:100%;}\n"
+            "th,td{text-align:left;padding:4px 8px;vertical-align:middle;}\n"
+            f".sub{{color:{_HTML_FG_SUB};font-size:90%;}}\n"
+            ".bar{background:#3a3a3a;border-radius:4px;height:8px;width:160px;}\n"
+            ".bar>div{background:#ffffff;border-radius:4px;height:8px;}\n"
+            "img{width:32px;height:32px;border-radius:4px;}\n"
+            "a{color:#93c5fd;}\n"
+            "</style>\n</head>\n<body>\n"
+        )
+
+    def _nav(self, no, has_next):
+        index_name = os.path.basename(self.path)
+        links = [f"<a href=\"{html.escape(index_name)}\">目次</a>"]
+        if no > 1:
+            links.append(f"<a href=\"{self._page_name(no - 1)}\">← 前へ</a>")
+        if has_next:
+            links.append(f"<a href=\"{self._page_name(no + 1)}\">次へ →</a>")
+        return "<nav>" + " | ".join(links) + "</nav>\n"
+
+    def _open_page(self):
+        self._page_no += 1
+        self._page_games = 0
+        self._page = open(
+            os.path.join(self._dir, self._page_name(self._page_no)), "w", encoding="utf-8"
+        )
+        self._page.write(self._head(f"{self.title} ({self._page_no})"))
+        # 次のページがあるかはまだ分からないので「次へ」付きで書き、最後のページなら閉じるときに消す
+        self._top_nav_at = self._page.tell()
+        self._page.write(self._nav(self._page_no, has_next=True))
+
+    def _close_page(self, has_next):
+        if self._page is None:
+            return
+        self._page.write(self._nav(self._page_no, has_next=has_next))
+        self._page.write("</body>\n</html>\n")
+        if not has_next:
+            # 同じバイト数になるよう空白で埋めて上書きする（HTML では空白は表示に影響しない）
+            full = self._nav(self._page_no, has_next=True)
+            last = self._nav(self._page_no, has_next=False)
+            pad = len(full.encode("utf-8")) - len(last.encode("utf-8"))
+            self._page.seek(self._top_nav_at)
+            self._page.write(last[:-1] + " " * pad + "\n")
+        self._page.close()
+        self._page = None
+
+    @staticmethod
+    def _bar(pct):
+        return f"<div class=\"bar\"><div style=\"width:{pct:.1f}%\"></div></div>"
+
+    # -----------------------------
+    # 書き込み
+    # -----------------------------
+    def write_game(self, appid, game_name, achievements, status, fetched_at=None):
+        if self._page is not None and self._page_games >= self.games_per_page:
+            self._close_page(has_next=True)
+        if self._page is None:
+            self._open_page()
+
+        total = len(achievements)
+        unlocked = sum(1 for a in achievements if status.get(a.get("name")) == 1)
+        pct = (unlocked / total * 100.0) if total else 0.0
+        name = html.escape(game_name or f"AppID {appid}")
+        anchor = f"app-{appid}"
+
+        fetched = ""
+        if self.with_freshness:
+            fetched = f" ／ 取得: {format_fetched_at(fetched_at) or '不明'}"
+
+        p = self._page
+        p.write(
+            f"<section id=\"{anchor}\">\n<h2>{name}</h2>\n"
+            f"<p class=\"sub\">AppID: {appid} ／ {unlocked} / {total}（{pct:.1f}%）{fetched}</p>\n"
+            f"{self._bar(pct)}\n<table>\n"
+        )
+        for a in achievements:
+            api = a.get("name")
+            done = status.get(api) == 1
+            icon = ""
+            if self.include_icons:
+                src = a.get("icon") if done else (a.get("icongray") or a.get("icon"))
+                if src:
+                    icon = f"<img src=\"{html.escape(src)}\" loading=\"lazy\" alt=\"\">"
+            p.write(
+                f"<tr><td>{icon}</td>"
+                f"<td>{html.escape(a.get('displayName', ''))}</td>"
+                f"<td class=\"sub\">{html.escape(a.get('description', ''))}</td>"
+                f"<td>{achieved_mark(status, api)}</td></tr>\n"
+            )
+            self.rows += 1
+        p.write("</table>\n</section>\n")
+        self._page_games += 1
+
+        self._games += 1
+        self._unlocked += unlocked
+        self._total += total
+
+        self._index.write(
+            f"<tr><td><a href=\"{self._page_name(self._page_no)}#{anchor}\">{name}</a></td>"
+            f"<td>{unlocked} / {total}</td><td>{self._bar(pct)} {pct:.1f}%</td></tr>\n"
+        )
+
+    def close(self):
+        self._close_page(has_next=False)
+
+        pct = (self._unlocked / self._total * 100.0) if self._total else 0.0
+        self._index.write(
+            "</table>\n"
+            f"<p class=\"sub\">ゲーム数: {self._games} ／ 実績: {self._unlocked} / {self._total}"
+            f"（{pct:.1f}%）</p>\n"
+            "</body>\n</html>\n"
+        )
+        self._index.close()
+
+
+def write_records(writer, store, items):
+    """保存済みの取得結果から書き出す（API は呼ばない）。書いたゲーム数を返す
+
+    items は [(appid, name)]。未取得・実績なしのゲームは飛ばす。
+    """
+    written = 0
+    for appid, name in items:
+        rec = store.load(appid)
+        if not rec or rec.get("achievements") is None:
+            continue
+        writer.write_game(
+            appid,
+            rec.get("game_name") or name,
+            rec["achievements"],
+            rec.get("status") or {},
+            fetched_at=rec.get("fetched_at"),
+        )
+        written += 1
+    return written
+
+
+def open_report_writer(fmt, path, with_freshness=False, compression=None, level=None):
+    """出力形式に応じたライターを返す（with_freshness で取得日時を併記）
+
+    compression は CSV のみ（HTML はブラウザでそのまま開けるよう圧縮しない）。
+    """
+    if fmt == "html":
+        return HtmlReportWriter(path, with_freshness=with_freshness)
+    return CsvReportWriter(
+        path, with_freshness=with_freshness, compression=compression, level=level
+    )
+
+
+# 出力形式ごとの拡張子
+REPORT_EXTENSIONS = {
+    "csv": ".csv",
+    "html": ".html",
+}
+
+
+def report_pages_pattern(path):
+    """HTML の分割ページ（<名前>_p001.html …）のファイル名に合う正規表現。HTML 以外は None"""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    if ext.lower() != ".html":
+        return None
+    return re.escape(stem) + r"_p\d{3,}\.html"
+
+
+def report_extension(fmt, compression=None):
+    """出力ファイルの拡張子（圧縮する CSV は .csv.gz など）"""
+    ext = REPORT_EXTENSIONS.get(fmt, ".csv")
+    if compression and fmt != "html":
+        ext += COMPRESSION_EXTENSIONS[compression]
+    return ext
@@ -0,0 +1,62 @@
+import json
+import os
+import time
+
+from atomic_io import atomic_write_json
+
+# -----------------------------
+# 実績マスタ（GetSchemaForGame）のディスクキャッシュ
+# -----------------------------
+# <root>/<言語>/<appid>.json に 1 ゲーム 1 ファイル。
+# 書き込みは一時ファイル＋os.replace なので、複数のスレッド・プロセスから同時に使ってよい
+# （同じゲームを同時に書いても、どちらかの完全なファイルが残るだけ）。
+# 実績マスタはゲームの更新でしか変わらないので、TTL は長めにする。
+
+SCHEMA_CACHE_DIR = "schema_cache"
+SCHEMA_TTL = 7 * 86400   # 秒
+
+
+class SchemaCache:
+    def __init__(self, root=SCHEMA_CACHE_DIR, ttl=SCHEMA_TTL):
+        self.root = root
+        self.ttl = ttl
+
+    def path_for(self, appid, lang):
+        return os.path.join(self.root, lang, f"{int(appid)}.json")
+
+    def get(self, appid, lang="japanese"):
+        """(ゲーム名, 実績リスト) を返す。無い・期限切れなら None"""
+        try:
+            with open(self.path_for(appid, lang), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self.ttl and time.time() - entry.get("fetched_at", 0) > self.ttl:
+            return None
+        return entry.get("game_name"), entry.get("achievements") or []
+
+    def has(self, appid, lang="japanese"):
+        """期限内のキャッシュがあるか。中身は読まず、ファイルの更新時刻だけで判断する
+
+        見積もり（GUI のスレッド）や先読みのロック中に数千件まとめて呼ばれるので軽くしておく。
+        put は丸ごと書き直すので、更新時刻は fetched_at とほぼ同じになる。
+        """
+        try:
+            mtime = os.stat(self.path_for(appid, lang)).st_mtime
+        except OSError:
+            return False
+        return not self.ttl or time.time() - mtime <= self.ttl
+
+    def put(self, appid, lang, game_name, achievements):
+        path = self.path_for(appid, lang)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write_json(
+            path,
+            {
+                "appid": int(appid),
+                "lang": lang,
+                "game_name": game_name,
+                "achievements": achievements,
+                "fetched_at": int(time.time()),
+            },
+        )
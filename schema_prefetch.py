@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+
+# -----------------------------
+# 実績マスタの先読み（バックグラウンド・低優先度）
+# -----------------------------
+# 一覧を取得した後、チェック済みのゲームと最近遊んだゲームの実績マスタを
+# 1 本のスレッドで少しずつ取ってキャッシュしておく。
+#   - Export 中（should_pause() が真）は止まって待つ → 本番の通信を邪魔しない
+#   - 1 件ごとに PREFETCH_INTERVAL 秒あける → API 上限と回線を食いつぶさない
+#   - 取るものが無くなったらスレッドを終える
+
+PREFETCH_INTERVAL = 0.3    # 秒
+PREFETCH_LIMIT = 300       # 1 回の先読みで取る最大件数
+RECENT_DAYS = 14
+PAUSE_POLL = 0.5           # 秒
+
+
+def prefetch_candidates(games, selected, now=None, recent_days=RECENT_DAYS):
+    """先読みする AppID の順番：チェック済み → 最近遊んだ順
+
+    実績（コミュニティ統計）のないゲームは取っても空なので除く。
+    """
+    now = time.time() if now is None else now
+    games = [g for g in games if g.get("has_community_visible_stats")]
+    order = [g.get("appid") for g in games if g.get("appid") in selected]
+    seen = set(order)
+    recent = [
+        g for g in games
+        if g.get("appid") not in seen
+        and (g.get("rtime_last_played") or 0) >= now - recent_days * 86400
+    ]
+    recent.sort(key=lambda g: -(g.get("rtime_last_played") or 0))
+    order += [g.get("appid") for g in recent]
+    return order
+
+
+class SchemaPrefetcher:
+    """fetch(appid) で 1 件取ってキャッシュする処理を、優先度低めに回す"""
+
+    def __init__(self, fetch, is_cached, should_pause=None, interval=PREFETCH_INTERVAL,
+                 limit=PREFETCH_LIMIT, log=None):
+        self.fetch = fetch
+        self.is_cached = is_cached
+        self.should_pause = should_pause or (lambda: False)
+        self.interval = interval
+        self.limit = limit
+        self.log = log or (lambda msg: None)
+
+        self._queue = deque()
+        self._queued = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.fetched = 0
+
+    def add(self, appids, front=False):
+        """先読み対象を追加（front=True なら先頭に。チェックを付けたゲーム用）"""
+        with self._lock:
+            new = [a for a in appids if a not in self._queued]
+            self._queued.update(new)
+            if front:
+                self._queue.extendleft(reversed(new))
+            else:
+                self._queue.extend(new)
+            if new and self._thread is None:
+                self._stop = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(self._stop,), daemon=True
+                )
+                self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            self._stop.set()
+            self._queue.clear()
+            self._queued.clear()
+            self._thread = None
+
+    def _next(self, stop):
+        """次に取る AppID。無ければスレッドの終了を記録して None"""
+        with self._lock:
+            while self._queue and not stop.is_set():
+                appid = self._queue.popleft()
+                self._queued.discard(appid)
+                if not self.is_cached(appid):
+                    return appid
+            if not stop.is_set():
+                self._thread = None
+            return None
+
+    def _run(self, stop):
+        while not stop.is_set():
+            # Export 中は先読みを止める
+            if self.should_pause():
+                stop.wait(PAUSE_POLL)
+                continue
+            appid = self._next(stop) if self.fetched < self.limit else None
+            if appid is None:
+                break
+            try:
+                self.fetch(appid)
+                self.fetched += 1
+            except Exception as e:
+                self.log(f"先読みエラー (AppID: {appid}): {e}")
+            stop.wait(self.interval)
+        with self._lock:
+            if self._stop is stop:
+                self._thread = None
@@ -0,0 +1,92 @@
+import json
+import os
+
+from atomic_io import atomic_write_json
+from config_store import default_config_path
+
+# -----------------------------
+# 選択状態（AppID の集合）
+# -----------------------------
+# チェックボックスの表示とは独立して持つ。一括操作は集合演算だけで終わり、
+# ウィジェットへの反映は GUI 側がアイドル時に少しずつ行う。
+
+
+class SelectionModel:
+    def __init__(self, appids=()):
+        self._selected = set(appids)
+
+    def __contains__(self, appid):
+        return appid in self._selected
+
+    def __len__(self):
+        return len(self._selected)
+
+    def __iter__(self):
+        return iter(self._selected)
+
+    def set(self, appid, value: bool):
+        if value:
+            self._selected.add(appid)
+        else:
+            self._selected.discard(appid)
+
+    def select(self, appids):
+        self._selected.update(appids)
+
+    def deselect(self, appids):
+        self._selected.difference_update(appids)
+
+    def invert(self, appids):
+        """appids の範囲だけ選択を反転"""
+        self._selected.symmetric_difference_update(set(appids))
+
+    def clear(self):
+        self._selected.clear()
+
+    def replace(self, appids):
+        self._selected = set(appids)
+
+    def to_list(self):
+        return sorted(self._selected)
+
+
+# -----------------------------
+# 選択プリセット
+# -----------------------------
+LAST_SELECTION = "__last__"   # 前回終了時の選択
+
+
+def default_presets_path():
+    return os.path.join(os.path.dirname(default_config_path()), "selection_presets.json")
+
+
+class SelectionPresets:
+    """名前付きの選択セット（AppID のリスト）をファイルに保存する"""
+
+    def __init__(self, path=None):
+        self.path = path or default_presets_path()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._presets = json.load(f)
+        except (OSError, ValueError):
+            self._presets = {}
+
+    def names(self):
+        return sorted(n for n in self._presets if n != LAST_SELECTION)
+
+    def get(self, name):
+        return list(self._presets.get(name, []))
+
+    def save(self, name, appids):
+        self._presets[name] = sorted(appids)
+        self._write()
+
+    def delete(self, name):
+        if self._presets.pop(name, None) is not None:
+            self._write()
+
+    def _write(self):
+        try:
+            atomic_write_json(self.path, self._presets)
+        except OSError:
+            pass
@@ -1,5 +1,5 @@
 import tkinter as tk
-from tkinter import filedialog
+from tkinter import ttk, filedialog
 import os
 
 # --- カラー定義 ---
@@ -18,6 +18,9 @@ class SettingsPage(tk.Frame):
         steam_id_var: tk.StringVar,
         output_path_var: tk.StringVar,
         save_config_callback=None,
+        profile_var: tk.StringVar = None,
+        profile_names=None,
+        switch_profile_callback=None,
         *args,
         **kwargs
     ):
@@ -27,6 +30,9 @@ class SettingsPage(tk.Frame):
         self.steam_id = steam_id_var
         self.output_path = output_path_var
         self.save_config_callback = save_config_callback
+        self.profile = profile_var or tk.StringVar()
+        self.profile_names = list(profile_names or [])
+        self.switch_profile_callback = switch_profile_callback
 
         self._build_layout()
         self._setup_trace()
@@ -156,6 +162,27 @@ class SettingsPage(tk.Frame):
         form = tk.Frame(self, bg=BG_PANEL)
         form.pack(fill="x", padx=20)
 
+        # --- プロファイル（名前を入力して Enter で新規作成）
+        row0 = tk.Frame(form, bg=BG_PANEL)
+        row0.pack(fill="x", pady=6)
+
+        tk.Label(row0, text="プロファイル：", bg=BG_PANEL, fg=FG_MAIN,
+                 width=14, anchor="e").pack(side="left")
+
+        self.profile_combo = ttk.Combobox(
+            row0,
+            textvariable=self.profile,
+            values=self.profile_names,
+            style="Crystal.TCombobox",
+            width=24,
+        )
+        self.profile_combo.pack(side="left", padx=(0, 8))
+        self.profile_combo.bind("<<ComboboxSelected>>", self._on_profile_selected)
+        self.profile_combo.bind("<Return>", self._on_profile_selected)
+
+        tk.Label(row0, text="※ 新しい名前を入力して Enter で追加",
+                 bg=BG_PANEL, fg="#9ca3af", font=("NotoSansJP", 9)).pack(side="left")
+
         # --- API Key（60%）
         row1 = tk.Frame(form, bg=BG_PANEL)
         row1.pack(fill="x", pady=6)
@@ -282,6 +309,17 @@ class SettingsPage(tk.Frame):
             font=("NotoSansJP", 10)
         ).pack(anchor="w")
 
+    # =============================================================================
+    # プロファイル
+    # =============================================================================
+    def _on_profile_selected(self, _=None):
+        if self.switch_profile_callback:
+            self.switch_profile_callback(self.profile.get())
+
+    def set_profiles(self, names):
+        self.profile_names = list(names)
+        self.profile_combo.configure(values=self.profile_names)
+
     # =============================================================================
     # 自動保存
     # =============================================================================
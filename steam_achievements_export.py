@@ -1,13 +1,43 @@
 import tkinter as tk
-from tkinter import ttk, messagebox
-import requests
-import csv
+from tkinter import ttk, messagebox, simpledialog
 import time
 import os
-import json
 import threading
 import re   # ★ 禁止文字除去に必要
 from settings_page import SettingsPage
+from report_writers import open_report_writer, write_records, report_extension, report_pages_pattern
+from compressed_io import compression_for_path, resolve_compression
+from steam_api import (
+    get_owned_games,
+    fetch_game_record,
+    configure_hedging,
+    hedging_stats,
+    set_quota_ledger,
+    set_schema_cache,
+    get_schema,
+)
+from schema_cache import SchemaCache
+from schema_prefetch import SchemaPrefetcher, prefetch_candidates
+from api_quota import QuotaLedger, plan_export, DAILY_LIMIT
+from http_cassette import install_from_env
+from hedging import stats_since
+from memory_profile import profiler_from_env
+from atomic_io import AtomicOutput, atomic_output
+from achievement_store import open_account_store, store_root_for
+from config_store import ConfigStore
+from selection_model import SelectionModel, SelectionPresets, LAST_SELECTION
+from game_facets import GameIndex
+from completion_stats import write_summary
+from export_pipeline import ExportPipeline
+from export_jobs import ExportJob, JobQueue, RUNNING, DONE, CANCELED, FAILED
+from failure_policy import (
+    call_with_retry,
+    write_dead_letter,
+    load_dead_letter,
+    latest_dead_letter,
+    FAILURE_LABELS,
+)
+from export_scheduler import order_longest_first, ThroughputMeter, format_eta
 
 import sys, os
 
@@ -22,11 +52,13 @@ def resource_path(relative_path):
 # -----------------------------
 # 設定
 # -----------------------------
-CONFIG_PATH = "config.json"
-
 APP_TITLE = "Steam 実績エクスポーター"
 DEFAULT_OUTPUT = os.path.join("C:\\", "steam_export", "steam_achievements_jp.csv")
 USE_JP_TITLE = True
+EXPORT_CONCURRENCY = 4  # 同時に取得するゲーム数
+CHECK_REFRESH_CHUNK = 300  # 一括選択後、1 回のアイドル処理で反映するチェック数
+LIST_FIRST_CHUNK = 60      # 一覧取得直後にまとめて作る行数（最初の 1 画面分）
+LIST_BUILD_CHUNK = 150     # 残りの行を 1 回のアイドル処理で作る数
 
 # カラー
 BG_ROOT = "#232120"
@@ -53,53 +85,6 @@ def safe_filename(name: str) -> str:
     return name if name else "game"
 
 
-# -----------------------------
-# API
-# -----------------------------
-def get_owned_games(api_key, steam_id):
-    if not api_key or not steam_id:
-        raise ValueError("API Key と SteamID64 を設定タブで入力してください。")
-
-    url = (
-        "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
-        f"?key={api_key}&steamid={steam_id}"
-        "&include_appinfo=1&include_played_free_games=1"
-    )
-    resp = requests.get(url, timeout=15)
-    resp.raise_for_status()
-    data = resp.json()
-    return data.get("response", {}).get("games", [])
-
-
-def get_schema_and_achievements(api_key, steam_id, appid):
-    # 実績の取得状況
-    stats_url = (
-        "https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v1/"
-        f"?key={api_key}&steamid={steam_id}&appid={appid}"
-    )
-    stats_resp = requests.get(stats_url, timeout=15).json()
-    if "playerstats" not in stats_resp or "achievements" not in stats_resp["playerstats"]:
-        return None, None, None
-
-    achievements_status = {
-        a["apiname"]: a["achieved"]
-        for a in stats_resp["playerstats"]["achievements"]
-    }
-
-    # 実績のマスタ（日本語名）
-    schema_url = (
-        "https://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2/"
-        f"?key={api_key}&appid={appid}&l=japanese"
-    )
-    schema_resp = requests.get(schema_url, timeout=15).json()
-
-    game = schema_resp.get("game", {})
-    jp_game_name = game.get("gameName")
-    achievements = game.get("availableGameStats", {}).get("achievements", [])
-
-    return jp_game_name, achievements, achievements_status
-
-
 # -----------------------------
 # GUI：丸チェック
 # -----------------------------
@@ -147,13 +132,16 @@ class RoundCheck(tk.Frame):
         self.label_name.bind("<Button-1>", self.toggle)
         self.label_appid.bind("<Button-1>", self.toggle)
 
-        self._draw()
+        # アイテムは 1 度だけ作り、以降は中の丸の表示／非表示だけ切り替える
+        self.canvas.create_oval(2, 2, 16, 16, outline="#9ca3af", width=2)
+        self._dot = self.canvas.create_oval(
+            5, 5, 13, 13, fill="#f9fafb", outline="", state="hidden"
+        )
 
     def _draw(self):
-        self.canvas.delete("all")
-        self.canvas.create_oval(2, 2, 16, 16, outline="#9ca3af", width=2)
-        if self.var.get():
-            self.canvas.create_oval(5, 5, 13, 13, fill="#f9fafb", outline="")
+        self.canvas.itemconfig(
+            self._dot, state="normal" if self.var.get() else "hidden"
+        )
 
     def toggle(self, _):
         self.var.set(not self.var.get())
@@ -165,6 +153,8 @@ class RoundCheck(tk.Frame):
         return self.var.get()
 
     def set(self, value: bool):
+        if self.var.get() == value:
+            return
         self.var.set(value)
         self._draw()
 
@@ -205,11 +195,22 @@ class PillButton(tk.Canvas):
         self.radius = height // 2
         self.enabled = True
 
+        # 形（左右の丸＋中央の長方形）と文字は 1 度だけ作る
+        self._shapes = (
+            self.create_oval(0, 0, 0, 0),
+            self.create_oval(0, 0, 0, 0),
+            self.create_rectangle(0, 0, 0, 0),
+        )
+        self._label = self.create_text(
+            0, 0, text=self.text, font=("NotoSansJP", 11, "bold")
+        )
+
         self.bind("<Enter>", self._on_enter)
         self.bind("<Leave>", self._on_leave)
         self.bind("<ButtonPress-1>", self._on_press)
         self.bind("<ButtonRelease-1>", self._on_release)
-        self.bind("<Configure>", lambda e: self._draw())
+        self.bind("<Configure>", lambda e: self._layout())
+        self._layout()
         self._draw()
 
     def set_enabled(self, enabled: bool):
@@ -222,33 +223,31 @@ class PillButton(tk.Canvas):
             self.current_color = "#2b2a29"
         self._draw()
 
-    def _draw(self):
-        self.delete("all")
+    def set_text(self, text):
+        self.text = text
+        self.itemconfig(self._label, text=text)
+
+    def _layout(self):
+        """サイズ変更時だけ座標を更新"""
         w = self.winfo_width()
         h = self.winfo_height()
 
         r = self.radius
+        left, right, rect = self._shapes
         # 左の丸
-        self.create_oval(0, 0, h, h, fill=self.current_color, outline=self.current_color)
+        self.coords(left, 0, 0, h, h)
         # 右の丸
-        self.create_oval(w - h, 0, w, h, fill=self.current_color, outline=self.current_color)
+        self.coords(right, w - h, 0, w, h)
         # 中央の長方形
-        self.create_rectangle(
-            r,
-            0,
-            w - r,
-            h,
-            fill=self.current_color,
-            outline=self.current_color,
-        )
+        self.coords(rect, r, 0, w - r, h)
 
-        self.create_text(
-            w // 2,
-            h // 2,
-            text=self.text,
-            fill=self.fg_color,
-            font=("NotoSansJP", 11, "bold"),
-        )
+        self.coords(self._label, w // 2, h // 2)
+
+    def _draw(self):
+        """色だけ塗り直す（ホバー／押下／有効・無効の切り替え）"""
+        for item in self._shapes:
+            self.itemconfig(item, fill=self.current_color, outline=self.current_color)
+        self.itemconfig(self._label, fill=self.fg_color)
 
     def _on_enter(self, _):
         if not self.enabled:
@@ -307,21 +306,19 @@ class RoundedProgressBar(tk.Canvas):
         # フェード用 after id
         self._fade_after = None
 
+        # トラックとバーのカプセルは 1 度だけ作り、以降は coords で動かす
+        self._track = self._create_capsule(self.track_color)
+        self._bar = self._create_capsule(self.bar_color)
+        self._last_geom = None
+
         # 値／サイズが変わったら再描画
         self.variable.trace_add("write", lambda *_: self._draw())
         self.bind("<Configure>", lambda e: self._draw())
 
     def _draw(self):
-        self.delete("all")
         w = self.winfo_width()
         h = self.winfo_height()
 
-        if w <= 2 or h <= 2:
-            return
-
-        # トラック（背景）
-        self._draw_capsule(0, 0, w, h, self.track_color)
-
         # 値に応じてバー
         try:
             value = float(self.variable.get())
@@ -329,55 +326,58 @@ class RoundedProgressBar(tk.Canvas):
             value = 0.0
 
         value = max(0.0, min(100.0, value))
-        if value <= 0:
+        fill_len = round(w * (value / 100.0), 1)
+
+        # 見た目が変わらない更新（アニメーションの端数など）は何もしない
+        geom = (w, h, fill_len)
+        if geom == self._last_geom:
             return
+        self._last_geom = geom
 
-        fill_len = w * (value / 100.0)
-        if fill_len <= 0:
+        if w <= 2 or h <= 2:
+            self._move_capsule(self._track, 0, 0, 0, 0)
+            self._move_capsule(self._bar, 0, 0, 0, 0)
             return
 
-        self._draw_capsule(0, 0, fill_len, h, self.bar_color)
+        # トラック（背景）
+        self._move_capsule(self._track, 0, 0, w, h)
+        self._move_capsule(self._bar, 0, 0, fill_len, h)
+
+    def _create_capsule(self, color):
+        """カプセル（左丸・右丸・中央の四角）のアイテムを作る"""
+        return (
+            self.create_oval(0, 0, 0, 0, fill=color, outline=color, state="hidden"),
+            self.create_oval(0, 0, 0, 0, fill=color, outline=color, state="hidden"),
+            self.create_rectangle(0, 0, 0, 0, fill=color, outline=color, state="hidden"),
+        )
 
-    def _draw_capsule(self, x0, y0, x1, y1, color):
-        """左右が丸いカプセル状のバーを描画"""
+    def _move_capsule(self, items, x0, y0, x1, y1):
+        """左右が丸いカプセル状のバーを指定位置へ動かす"""
+        left, right, rect = items
         w = x1 - x0
         h = y1 - y0
         r = h / 2
         if w <= 0 or h <= 0:
+            for item in items:
+                self.itemconfig(item, state="hidden")
             return
 
         if w <= h:
             # 幅が高さより小さいときは単純な丸
-            self.create_oval(x0, y0, x0 + w, y0 + h, fill=color, outline=color)
+            self.coords(left, x0, y0, x0 + w, y0 + h)
+            self.itemconfig(left, state="normal")
+            self.itemconfig(right, state="hidden")
+            self.itemconfig(rect, state="hidden")
             return
 
         # 左丸
-        self.create_oval(
-            x0,
-            y0,
-            x0 + h,
-            y0 + h,
-            fill=color,
-            outline=color,
-        )
+        self.coords(left, x0, y0, x0 + h, y0 + h)
         # 右丸
-        self.create_oval(
-            x1 - h,
-            y0,
-            x1,
-            y0 + h,
-            fill=color,
-            outline=color,
-        )
+        self.coords(right, x1 - h, y0, x1, y0 + h)
         # 中央の四角
-        self.create_rectangle(
-            x0 + r,
-            y0,
-            x1 - r,
-            y0 + h,
-            fill=color,
-            outline=color,
-        )
+        self.coords(rect, x0 + r, y0, x1 - r, y0 + h)
+        for item in items:
+            self.itemconfig(item, state="normal")
 
     def animate_to_zero(self, duration=300):
         """ゲージをふわっと減衰させながら 0 に戻すアニメーション"""
@@ -441,27 +441,86 @@ class SteamAchievementsGUI:
         self.round_checks = []
         self.search_var = tk.StringVar()
 
+        # 選択状態（AppID の集合）とプリセット
+        self.selection_presets = SelectionPresets()
+        self.selection = SelectionModel(self.selection_presets.get(LAST_SELECTION))
+        self.preset_var = tk.StringVar()
+        self._check_refresh_after = None
+        self._check_refresh_iter = None
+
+        # 一覧の行は少しずつ作る（_list_built 件目まで作成済み）
+        self._list_build_after = None
+        self._list_built = 0
+        self._row_filter = (None, None)
+        self._visible_count = 0
+        self.games_count_var = tk.StringVar()
+
+        # 絞り込み（ファセット）
+        self.game_index = GameIndex([])
+        self.facet_playtime_var = tk.StringVar()
+        self.facet_recent_var = tk.StringVar()
+        self.facet_stats_var = tk.StringVar(value="すべて")
+        self.facet_pct_min_var = tk.StringVar()
+        self.facet_pct_max_var = tk.StringVar()
+
         self.loading_label = None
         self.loading_text_var = tk.StringVar()
         self._loading_after_id = None
         self._loading = False
         self._loading_anim_step = 0
 
-        # Export 状態
+        # Export 状態（ジョブのキュー。_exporting はジョブ実行中かどうか）
         self._exporting = False
-        self._cancel_export = False
+        self.jobs = JobQueue()
+        self._job_rows = []
+
+        # オフライン（保存済みの結果だけで一覧・出力を作る。API は呼ばない）
+        self.offline = False
 
         # 進捗ゲージ用
         self.progress_var = tk.DoubleVar(value=0.0)
         self._progress_anim_after = None
         self._progress_current = 0.0
+        self.eta_var = tk.StringVar()
+
+        # 設定（プロファイル）
+        self.config_store = ConfigStore()
+        self.profile_var = tk.StringVar()
+        self._applying_profile = False
+        self.concurrency = EXPORT_CONCURRENCY
+        self.fetch_rarity = False
+        self.compression = None
+        self.compression_level = None
+
+        # 取得済み実績の保存先（並び替えの見積もりにも使う）
+        self.store = None
+
+        # API 呼び出し数（キーごとの 1 日の上限に対する見積もり）
+        self.quota = QuotaLedger()
+        set_quota_ledger(self.quota)
+        self.daily_call_limit = DAILY_LIMIT
+
+        # 実績マスタのキャッシュと先読み
+        self.schema_cache = None
+        self.prefetcher = None
+
+        # メモリの計測（STEAM_MEMPROFILE=1 のときだけ）
+        self.memprof = profiler_from_env(log=self._log_from_thread)
 
         self._setup_style()
         self._build_layout()
         self.load_config()
 
+        root.protocol("WM_DELETE_WINDOW", self._on_close)
         root.after(400, self.on_fetch_games)
 
+    def _on_close(self):
+        self.selection_presets.save(LAST_SELECTION, self.selection.to_list())
+        self._stop_prefetch()
+        self.config_store.flush()
+        self.quota.flush()
+        self.root.destroy()
+
     # -------------------------
     # スタイル
     # -------------------------
@@ -491,6 +550,17 @@ class SteamAchievementsGUI:
             foreground=[("selected", "#ffffff"), ("active", "#f9fafb")],
         )
 
+        style.configure(
+            "Crystal.TCombobox",
+            fieldbackground=SEARCH_BG,
+            background=SEARCH_BG,
+            foreground="#ffffff",
+            arrowcolor=FG_MAIN,
+            bordercolor=BG_PANEL,
+            lightcolor=BG_PANEL,
+            darkcolor=BG_PANEL,
+        )
+
         # スクロールバー（太さは OS デフォルトのまま）
         style.configure(
             "Crystal.Vertical.TScrollbar",
@@ -545,6 +615,9 @@ class SteamAchievementsGUI:
             steam_id_var=self.steam_id,
             output_path_var=self.output_path,
             save_config_callback=self.save_config,
+            profile_var=self.profile_var,
+            profile_names=self.config_store.profile_names(),
+            switch_profile_callback=self.switch_profile,
         )
         self.settings_page.pack(fill="both", expand=True)
 
@@ -561,13 +634,44 @@ class SteamAchievementsGUI:
         self.export_button = PillButton(top, "CSVで出力", self.on_export_achievements)
         self.export_button.pack(side="left", padx=(0, 10))
 
+        self.export_html_button = PillButton(
+            top, "HTMLで出力", lambda: self.on_export_achievements("html")
+        )
+        self.export_html_button.pack(side="left", padx=(0, 10))
+
+        self.retry_button = PillButton(top, "失敗分を再取得", self.on_retry_failed, width=130)
+        self.retry_button.pack(side="left", padx=(0, 10))
+
         PillButton(top, "すべて選択", self.select_all_games).pack(
             side="left", padx=(0, 10)
         )
-        PillButton(top, "選択解除", self.clear_all_games).pack(side="left")
+        PillButton(top, "選択解除", self.clear_all_games).pack(
+            side="left", padx=(0, 10)
+        )
+        PillButton(top, "選択反転", self.invert_games).pack(side="left")
 
         PillButton(top, "リスト更新", self.on_fetch_games).pack(side="right")
 
+        self.offline_button = PillButton(
+            top, "オフライン: OFF", self.toggle_offline, width=130
+        )
+        self.offline_button.pack(side="right", padx=(0, 10))
+
+        # 選択プリセット
+        PillButton(top, "プリセット保存", self.save_selection_preset).pack(
+            side="right", padx=(0, 10)
+        )
+        self.preset_combo = ttk.Combobox(
+            top,
+            textvariable=self.preset_var,
+            values=self.selection_presets.names(),
+            style="Crystal.TCombobox",
+            state="readonly",
+            width=18,
+        )
+        self.preset_combo.pack(side="right", padx=(0, 10))
+        self.preset_combo.bind("<<ComboboxSelected>>", self._on_preset_selected)
+
         center = tk.Frame(f, bg=BG_PANEL)
         center.pack(fill="both", expand=True, padx=16, pady=(4, 8))
 
@@ -643,6 +747,16 @@ class SteamAchievementsGUI:
 
         self.search_canvas.bind("<Configure>", redraw)
 
+        tk.Label(
+            header,
+            textvariable=self.games_count_var,
+            bg=BG_PANEL,
+            fg="#9ca3af",
+            font=("NotoSansJP", 9),
+        ).pack(side="right")
+
+        self._build_facet_row(games_frame)
+
         canvas = tk.Canvas(
             games_frame,
             bg=BG_PANEL,
@@ -704,6 +818,31 @@ class SteamAchievementsGUI:
         )
         log_scroll.pack(side="right", fill="y")
 
+        # Export ジョブの一覧（待機中・実行中・完了）
+        jobs_box = tk.Frame(log_frame, bg=BG_PANEL)
+        jobs_box.pack(fill="x", pady=(8, 0))
+
+        self.jobs_list = tk.Listbox(
+            jobs_box,
+            height=3,
+            bg=BG_ENTRY,
+            fg="#e5e7eb",
+            relief="flat",
+            bd=0,
+            highlightthickness=0,
+            selectbackground="#4b4a49",
+            activestyle="none",
+            font=("NotoSansJP", 9),
+        )
+        self.jobs_list.pack(side="left", fill="x", expand=True)
+
+        PillButton(
+            jobs_box, "ジョブ中止", self.on_cancel_selected_job, width=100, height=24
+        ).pack(side="left", padx=(8, 0))
+        PillButton(
+            jobs_box, "完了を消去", self.on_clear_finished_jobs, width=100, height=24
+        ).pack(side="left", padx=(8, 0))
+
         # 進捗ゲージ + 中止ボタン（右側）
         progress_box = tk.Frame(log_frame, bg=BG_PANEL)
         progress_box.pack(fill="x", pady=(8, 0))
@@ -751,9 +890,99 @@ class SteamAchievementsGUI:
         self.cancel_button.pack(side="left", padx=(8, 0))
         self.cancel_button.set_enabled(False)
 
+        # 件数・速度・残り時間
+        tk.Label(
+            progress_box,
+            textvariable=self.eta_var,
+            bg=BG_PANEL,
+            fg="#9ca3af",
+            font=("NotoSansJP", 9),
+        ).pack(side="left", padx=(10, 0))
+
         self._init_search_placeholder()
         self.search_var.trace_add("write", lambda *_: self.filter_games())
 
+    # -----------------------------
+    # 絞り込み条件
+    # -----------------------------
+    def _build_facet_row(self, parent):
+        row = tk.Frame(parent, bg=BG_PANEL)
+        row.pack(fill="x", pady=(0, 10))
+
+        def label(text):
+            tk.Label(row, text=text, bg=BG_PANEL, fg="#9ca3af",
+                     font=("NotoSansJP", 9)).pack(side="left")
+
+        def entry(var):
+            tk.Entry(
+                row,
+                textvariable=var,
+                width=5,
+                bg=SEARCH_BG,
+                fg="#ffffff",
+                relief="flat",
+                bd=0,
+                insertbackground="#ffffff",
+                justify="right",
+            ).pack(side="left", padx=4, ipady=2)
+
+        label("プレイ時間")
+        entry(self.facet_playtime_var)
+        label("時間以上　　最近")
+        entry(self.facet_recent_var)
+        label("日以内にプレイ　　達成率")
+        entry(self.facet_pct_min_var)
+        label("〜")
+        entry(self.facet_pct_max_var)
+        label("%　　実績")
+
+        ttk.Combobox(
+            row,
+            textvariable=self.facet_stats_var,
+            values=["すべて", "あり", "なし"],
+            style="Crystal.TCombobox",
+            state="readonly",
+            width=6,
+        ).pack(side="left", padx=4)
+
+        for var in (
+            self.facet_playtime_var,
+            self.facet_recent_var,
+            self.facet_stats_var,
+            self.facet_pct_min_var,
+            self.facet_pct_max_var,
+        ):
+            var.trace_add("write", lambda *_: self.filter_games())
+
+    @staticmethod
+    def _facet_number(var):
+        try:
+            return float(var.get().strip())
+        except ValueError:
+            return None
+
+    def _facet_matches(self):
+        """ファセット条件に合う AppID の集合（条件なしなら None）"""
+        hours = self._facet_number(self.facet_playtime_var)
+        days = self._facet_number(self.facet_recent_var)
+        pct_min = self._facet_number(self.facet_pct_min_var)
+        pct_max = self._facet_number(self.facet_pct_max_var)
+        stats = {"あり": True, "なし": False}.get(self.facet_stats_var.get())
+
+        if hours is None and days is None and pct_min is None and pct_max is None and stats is None:
+            return None
+
+        return self.game_index.query(
+            playtime_min=hours * 60 if hours is not None else None,
+            played_within_days=days,
+            has_stats=stats,
+            completion_min=pct_min,
+            completion_max=pct_max,
+        )
+
+    def _rebuild_game_index(self):
+        self.game_index = GameIndex(self.games, self.store.summary())
+
     # -----------------------------
     # 検索プレースホルダー
     # -----------------------------
@@ -790,17 +1019,88 @@ class SteamAchievementsGUI:
         self.root.after(0, lambda m=msg: self.log(m))
 
     def clear_games_list(self):
+        if self._check_refresh_after is not None:
+            self.root.after_cancel(self._check_refresh_after)
+            self._check_refresh_after = None
+        self._stop_list_build()
         for w in self.games_inner.winfo_children():
             w.destroy()
         self.round_checks.clear()
+        self._visible_count = 0
+        self.games_count_var.set("")
+
+    # -----------------------------
+    # 選択（モデルを書き換え、チェック表示は後から追従）
+    # -----------------------------
+    def _visible_appids(self):
+        """表示中の AppID（まだ行を作っていないゲームも、絞り込みに合えば含める）"""
+        appids = [appid for appid, name, rc in self.round_checks if rc.visible]
+        if self._list_build_after is None:
+            return appids
+        for g in self.games[self._list_built:]:
+            appid = g.get("appid")
+            if self._row_matches(appid, g.get("name", f"AppID {appid}")):
+                appids.append(appid)
+        return appids
 
     def select_all_games(self):
-        for appid, name, rc in self.round_checks:
-            rc.set(True)
+        """表示中（検索で絞り込まれた）ゲームをすべて選択"""
+        self.selection.select(self._visible_appids())
+        self._refresh_checks()
 
     def clear_all_games(self):
-        for appid, name, rc in self.round_checks:
-            rc.set(False)
+        self.selection.clear()
+        self._refresh_checks()
+
+    def invert_games(self):
+        """表示中のゲームの選択を反転"""
+        self.selection.invert(self._visible_appids())
+        self._refresh_checks()
+
+    def _on_check_toggled(self, appid, rc):
+        self.selection.set(appid, rc.get())
+        if rc.get() and self.prefetcher is not None:
+            self.prefetcher.add([appid], front=True)
+
+    def _refresh_checks(self):
+        """選択モデルの内容をチェック表示へ少しずつ反映する"""
+        if self._check_refresh_after is not None:
+            self.root.after_cancel(self._check_refresh_after)
+            self._check_refresh_after = None
+        self._check_refresh_iter = iter(list(self.round_checks))
+        self._refresh_checks_step()
+
+    def _refresh_checks_step(self):
+        selection = self.selection
+        for _ in range(CHECK_REFRESH_CHUNK):
+            item = next(self._check_refresh_iter, None)
+            if item is None:
+                self._check_refresh_after = None
+                return
+            appid, name, rc = item
+            rc.set(appid in selection)
+        self._check_refresh_after = self.root.after(1, self._refresh_checks_step)
+
+    def save_selection_preset(self):
+        if not len(self.selection):
+            messagebox.showinfo("情報", "保存するゲームにチェックを入れてください。")
+            return
+        name = simpledialog.askstring(
+            "プリセット保存", "プリセット名：", initialvalue=self.preset_var.get(), parent=self.root
+        )
+        if not name or not name.strip() or name.strip() == LAST_SELECTION:
+            return
+        name = name.strip()
+        self.selection_presets.save(name, self.selection.to_list())
+        self.preset_combo.configure(values=self.selection_presets.names())
+        self.preset_var.set(name)
+        self.log(f"プリセット保存: {name}（{len(self.selection)} 件）")
+
+    def _on_preset_selected(self, _=None):
+        name = self.preset_var.get()
+        self.selection.replace(self.selection_presets.get(name))
+        self._refresh_checks()
+        self.log(f"プリセット適用: {name}（{len(self.selection)} 件）")
 
     def filter_games(self):
         keyword = self.search_var.get().lower().strip()
@@ -808,14 +1108,20 @@ class SteamAchievementsGUI:
         if keyword == "" or keyword == "ゲーム検索":
             keyword = None
 
+        allowed = self._facet_matches()
+        # 作成途中の一覧は、この条件で残りの行を作る
+        self._row_filter = (keyword, allowed)
+
         for appid, name, rc in self.round_checks:
-            if keyword is None:
+            if keyword is None and allowed is None:
                 if not rc.visible:
                     rc.pack(anchor="w", fill="x", pady=2)
                     rc.visible = True
                 continue
 
-            match = keyword in name.lower()
+            match = (keyword is None or keyword in name.lower()) and (
+                allowed is None or appid in allowed
+            )
 
             if match and not rc.visible:
                 rc.pack(anchor="w", fill="x", pady=2)
@@ -824,6 +1130,63 @@ class SteamAchievementsGUI:
                 rc.pack_forget()
                 rc.visible = False
 
+        self._visible_count = sum(1 for _, _, rc in self.round_checks if rc.visible)
+        self._update_games_count()
+
+    def _row_matches(self, appid, name):
+        keyword, allowed = self._row_filter
+        return (keyword is None or keyword in name.lower()) and (
+            allowed is None or appid in allowed
+        )
+
+    def _update_games_count(self):
+        total = len(self.games)
+        if not total:
+            self.games_count_var.set("")
+        elif self._list_built < total:
+            self.games_count_var.set(
+                f"表示 {self._visible_count} / {total} 件（読み込み中 {self._list_built}）"
+            )
+        else:
+            self.games_count_var.set(f"表示 {self._visible_count} / {total} 件")
+
+    # -----------------------------
+    # 一覧の作成（最初の 1 画面分はすぐ、残りはアイドル時に少しずつ）
+    # -----------------------------
+    def _build_rows(self, count):
+        """self.games の続きから count 行を作る"""
+        selection = self.selection
+        end = min(len(self.games), self._list_built + count)
+        for g in self.games[self._list_built:end]:
+            appid = g.get("appid")
+            name = g.get("name", f"AppID {appid}")
+
+            rc = RoundCheck(self.games_inner, name_text=name, appid_text=str(appid))
+            rc.command = lambda a=appid, r=rc: self._on_check_toggled(a, r)
+            rc.set(appid in selection)
+            if self._row_matches(appid, name):
+                rc.pack(anchor="w", fill="x", pady=2)
+                self._visible_count += 1
+            else:
+                rc.visible = False
+            self.round_checks.append((appid, name, rc))
+        self._list_built = end
+        self._update_games_count()
+
+    def _build_list_step(self):
+        self._build_rows(LIST_BUILD_CHUNK)
+        if self._list_built < len(self.games):
+            self._list_build_after = self.root.after(1, self._build_list_step)
+            return
+        self._list_build_after = None
+        self.memprof.checkpoint("一覧表示", games=len(self.games), rows=len(self.round_checks))
+
+    def _stop_list_build(self):
+        if self._list_build_after is not None:
+            self.root.after_cancel(self._list_build_after)
+            self._list_build_after = None
+        self._list_built = 0
+
     # -----------------------------
     # Loading
     # -----------------------------
@@ -864,21 +1227,39 @@ class SteamAchievementsGUI:
     # -----------------------------
     # Fetch games
     # -----------------------------
+    def toggle_offline(self):
+        if self.jobs.has_pending() or self._loading:
+            return
+        self.offline = not self.offline
+        self.offline_button.set_text("オフライン: ON" if self.offline else "オフライン: OFF")
+        self.on_fetch_games()
+
     def on_fetch_games(self):
         if self._loading:
             return
 
         api_key = self.api_key.get().strip()
         steam_id = self.steam_id.get().strip()
+        offline = self.offline
+        self._ensure_account_store()
+        store = self.store
 
         self.log_text.delete("1.0", "end")
-        self.log("所有ゲームを取得中...")
+        self.log("保存済みの一覧を読み込み中..." if offline else "所有ゲームを取得中...")
         self._show_loading()
         self._loading = True
 
         def worker():
             try:
-                games = get_owned_games(api_key, steam_id)
+                if offline:
+                    games = store.load_owned_games()
+                else:
+                    games = get_owned_games(api_key, steam_id)
+                    # 次回オフラインで使えるように一覧を残しておく
+                    try:
+                        store.save_owned_games(games)
+                    except OSError as e:
+                        self._log_from_thread(f"一覧の保存エラー: {e}")
                 games = sorted(games, key=lambda g: g.get("name", "").lower())
                 error = None
             except Exception as e:
@@ -894,22 +1275,50 @@ class SteamAchievementsGUI:
         self._loading = False
 
         if error is not None:
-            messagebox.showerror("エラー", f"所有ゲームの取得に失敗しました:\n{error}")
+            messagebox.showerror(
+                "エラー",
+                f"所有ゲームの取得に失敗しました:\n{error}\n\n"
+                "オフラインにすると保存済みの結果から出力できます。",
+            )
             self.log(f"エラー: {error}")
             return
 
         self.games = games
-        self.log(f"取得したゲーム数: {len(games)}")
+        if self.offline:
+            self.log(f"保存済みのゲーム数: {len(games)}（オフライン）")
+        else:
+            self.log(f"取得したゲーム数: {len(games)}")
+        self._rebuild_game_index()
 
-        for g in games:
-            appid = g.get("appid")
-            name = g.get("name", f"AppID {appid}")
+        # 検索・ファセットの条件を決めてから、最初の 1 画面分だけすぐ作る
+        self._stop_list_build()
+        self.filter_games()
+        self._build_rows(LIST_FIRST_CHUNK)
+        self._list_build_after = self.root.after(1, self._build_list_step)
+        self._start_prefetch()
 
-            rc = RoundCheck(self.games_inner, name_text=name, appid_text=str(appid))
-            rc.pack(anchor="w", fill="x", pady=2)
-            self.round_checks.append((appid, name, rc))
+    # -----------------------------
+    # 実績マスタの先読み
+    # -----------------------------
+    def _start_prefetch(self):
+        """チェック済み・最近遊んだゲームの実績マスタを裏で少しずつ取っておく"""
+        self._stop_prefetch()
+        api_key = self.api_key.get().strip()
+        if self.offline or not api_key or self.schema_cache is None:
+            return
 
-        self.filter_games()
+        cache = self.schema_cache
+        self.prefetcher = SchemaPrefetcher(
+            fetch=lambda appid: get_schema(api_key, appid),
+            is_cached=cache.has,
+            should_pause=lambda: self._exporting,
+        )
+        self.prefetcher.add(prefetch_candidates(self.games, self.selection))
+
+    def _stop_prefetch(self):
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+            self.prefetcher = None
 
     # -----------------------------
     # 進捗ゲージ制御
@@ -964,48 +1373,99 @@ class SteamAchievementsGUI:
 
         step()
 
-    def _set_progress(self, current: int, total: int):
+    def _set_progress(self, current: int, total: int, meter=None, depths=None, job=None):
+        if job is not None:
+            job.done = current
+            self.root.after(0, lambda j=job: self._update_job_row(j))
+
         if total <= 0:
             target = 0.0
         else:
             target = (current / total) * 100.0
         self.root.after(0, lambda t=target: self._start_progress_anim(t))
 
+        if meter is not None:
+            rate = meter.rate()
+            eta = format_eta(meter.eta(total - current))
+            text = f"{current}/{total}　{rate:.1f} 件/秒　残り {eta}"
+            if depths:
+                # 各段の待ち件数（大きい段の手前がボトルネック）
+                text += "　待ち 取得{fetch}・変換{transform}・書込{write}".format(**depths)
+            self.root.after(0, lambda t=text: self.eta_var.set(t))
+
     # -----------------------------
     # Export 関連
     # -----------------------------
     def on_cancel_export(self):
-        if not self._exporting:
+        """実行中のジョブを中止する"""
+        job = self.jobs.running()
+        if job is None:
             return
-        self._cancel_export = True
-        self._log_from_thread("中止要求を受け付けました。しばらくお待ちください。")
+        self.jobs.cancel(job.id)
+        self.log(f"ジョブ #{job.id} の中止要求を受け付けました。しばらくお待ちください。")
+
+    def on_cancel_selected_job(self):
+        """一覧で選んだジョブを中止（待機中ならキューから外す）"""
+        sel = self.jobs_list.curselection()
+        if not sel:
+            self.on_cancel_export()
+            return
+        job = self.jobs.cancel(self._job_rows[sel[0]])
+        if job is None:
+            return
+        if job.status == CANCELED:
+            self.log(f"ジョブ #{job.id} を取り消しました。")
+        else:
+            self.log(f"ジョブ #{job.id} の中止要求を受け付けました。しばらくお待ちください。")
+        self._refresh_job_list()
 
-    def on_export_achievements(self):
-        # 連打防止
-        if self._exporting:
+    def on_clear_finished_jobs(self):
+        self.jobs.clear_finished()
+        self._refresh_job_list()
+
+    def _refresh_job_list(self):
+        self.jobs_list.delete(0, "end")
+        self._job_rows = [j.id for j in self.jobs.jobs]
+        for j in self.jobs.jobs:
+            self.jobs_list.insert("end", j.label())
+
+    def _update_job_row(self, job):
+        try:
+            i = self._job_rows.index(job.id)
+        except ValueError:
             return
+        self.jobs_list.delete(i)
+        self.jobs_list.insert(i, job.label())
 
+    def on_export_achievements(self, fmt="csv"):
         api_key = self.api_key.get().strip()
         steam_id = self.steam_id.get().strip()
+        self._ensure_account_store()
 
-        if not api_key or not steam_id:
+        if not self.offline and (not api_key or not steam_id):
             messagebox.showwarning(
                 "注意", "API Key と SteamID を設定タブで入力してください。"
             )
             return
 
-        selected = [(appid, name) for appid, name, rc in self.round_checks if rc.get()]
+        # 一覧の行がまだ作り終わっていなくても、選択はすべて書き出す
+        selected = [
+            (g.get("appid"), g.get("name", f"AppID {g.get('appid')}"))
+            for g in self.games
+            if g.get("appid") in self.selection
+        ]
         if not selected:
             messagebox.showinfo("情報", "書き出すゲームにチェックを入れてください。")
             return
 
         # 単品出力 → 完全安全なファイル名を使用
+        ext = report_extension(fmt, self.compression)
         if len(selected) == 1:
             raw_name = selected[0][1]
             name = safe_filename(raw_name)
-            auto_name = f"{name}_achievements.csv"
+            auto_name = f"{name}_achievements{ext}"
         else:
-            auto_name = "SteamGames_achievements.csv"
+            auto_name = f"SteamGames_achievements{ext}"
 
         base_dir = os.path.dirname(self.output_path.get())
         if not base_dir:
@@ -1016,111 +1476,369 @@ class SteamAchievementsGUI:
 
         output_path = os.path.join(base_dir, auto_name)
 
-        # 状態初期化
-        self.log_text.delete("1.0", "end")
-        self.log("実績取得を開始...")
+        if not self.offline:
+            selected = self._confirm_budget(api_key, selected)
+            if not selected:
+                return
+
+        self._enqueue_export(api_key, steam_id, selected, output_path, fmt)
+
+    def _confirm_budget(self, api_key, items, allow_trim=True):
+        """今日の残り呼び出し数に収まるか確認し、実行する items を返す（やめるなら None）"""
+        budget = plan_export(
+            items,
+            api_key,
+            self.quota,
+            self.daily_call_limit,
+            store=self.store,
+            schema_cached=self.schema_cache.has,
+        )
+        if budget.fits:
+            return items
+
+        detail = (
+            f"必要な API 呼び出し（見積もり）: {budget.needed} 回\n"
+            f"今日の残り: {budget.remaining} 回（上限 {budget.limit} 回）"
+        )
+        if not allow_trim or not budget.within:
+            ok = messagebox.askokcancel(
+                "API 呼び出し上限", f"{detail}\n\n上限を超える可能性があります。続けますか？"
+            )
+            return items if ok else None
+
+        answer = messagebox.askyesnocancel(
+            "API 呼び出し上限",
+            f"{detail}\n\n"
+            f"はい: 収まる {len(budget.within)} 件だけ書き出す\n"
+            f"いいえ: すべて書き出す\n"
+            "キャンセル: やめる",
+        )
+        if answer is None:
+            return None
+        if answer:
+            self.log(f"呼び出し上限に合わせて {len(items)} 件 → {len(budget.within)} 件に絞りました")
+            return budget.within
+        return items
+
+    def on_retry_failed(self):
+        """直近の失敗リストにある AppID だけを取り直し、元の出力に合流させる"""
+        if self.offline:
+            messagebox.showinfo("情報", "オフライン中は再取得できません。")
+            return
+
+        api_key = self.api_key.get().strip()
+        steam_id = self.steam_id.get().strip()
+        self._ensure_account_store()
+        if not api_key or not steam_id:
+            messagebox.showwarning(
+                "注意", "API Key と SteamID を設定タブで入力してください。"
+            )
+            return
+
+        base_dir = os.path.dirname(self.output_path.get()) or os.path.dirname(DEFAULT_OUTPUT)
+        path = latest_dead_letter(base_dir)
+        dl = load_dead_letter(path) if path else None
+        if not dl or not dl.get("failed"):
+            messagebox.showinfo("情報", "再取得が必要なゲームはありません。")
+            return
+
+        failed = [(f["appid"], f["name"]) for f in dl["failed"]]
+        items = [tuple(i) for i in dl.get("items", [])] or failed
+        if not self._confirm_budget(api_key, failed, allow_trim=False):
+            return
+        self._enqueue_export(
+            api_key, steam_id, failed, dl["output_path"], dl.get("format", "csv"),
+            merge_items=items,
+        )
+
+    def _enqueue_export(self, api_key, steam_id, selected, output_path, fmt, merge_items=None):
+        """Export をジョブとしてキューに積む（実行中でなければすぐ始める）"""
+        job = ExportJob(
+            selected, output_path, fmt, api_key, steam_id,
+            merge_items=merge_items, offline=self.offline, store=self.store,
+        )
+        overlap = self.jobs.add(job)
+        if self._exporting:
+            msg = f"ジョブ #{job.id} を追加しました（{len(selected)} 件）"
+            if overlap:
+                msg += f"。待機中のジョブと重なる {overlap} 件は取り直しません"
+            self.log(msg)
+        self._refresh_job_list()
+        if not self._exporting:
+            self._run_next_job()
+
+    def _run_next_job(self):
+        """待機中の次のジョブを始める。無ければ False"""
+        job = self.jobs.next_queued()
+        if job is None:
+            self.jobs.end_batch()
+            return False
+
+        job.status = RUNNING
+        self._refresh_job_list()
+        self.log(f"--- ジョブ #{job.id} ---")
+        if job.offline:
+            self.log("保存済みの結果から書き出し中（オフライン）...")
+        elif job.merge_items is None:
+            self.log("実績取得を開始...")
+        else:
+            self.log(f"失敗した {job.total} 件を再取得...")
         self._reset_progress()
-        self._cancel_export = False
+        self.eta_var.set("")
         self._exporting = True
-        self.export_button.set_enabled(False)
         self.cancel_button.set_enabled(True)
 
-        # 非同期で実績取得＆CSV書き出し（逐次書き込み）
-        thread = threading.Thread(
-            target=self._export_worker,
-            args=(api_key, steam_id, selected, output_path),
-            daemon=True,
-        )
-        thread.start()
-
-    def _export_worker(self, api_key, steam_id, selected, output_path):
+        # 非同期で実績取得＆書き出し（逐次書き込み）
+        target = self._offline_export_worker if job.offline else self._export_worker
+        threading.Thread(target=target, args=(job,), daemon=True).start()
+        return True
+
+    def _compression_args(self, output_path):
+        """出力パスの拡張子（.csv.gz など）に合わせた圧縮設定"""
+        return {
+            "compression": compression_for_path(output_path),
+            "level": self.compression_level,
+        }
+
+    def _fetch_game(self, api_key, steam_id, appid, base_name):
+        """ワーカースレッドで 1 ゲーム分を取得"""
+        self._log_from_thread(f"{base_name} (AppID: {appid}) 取得中...")
+        return fetch_game_record(api_key, steam_id, appid, with_rarity=self.fetch_rarity)
+
+    def _export_worker(self, job):
+        """job.selected を取得して書き出す
+
+        merge_items があるとき（失敗分の再取得）は selected だけを取得し、
+        出力は merge_items 全体を保存済みの結果から作り直す。
+        同じバッチの前のジョブで取得済みのゲームは、保存済みの結果を使う。
+        """
+        api_key, steam_id = job.api_key, job.steam_id
+        selected, output_path, fmt = job.selected, job.output_path, job.fmt
+        merge_items = job.merge_items
+        store = job.store
+        hedge_before = hedging_stats()   # ヘッジの数はこのジョブの分だけ出す
         total = len(selected)
-        canceled = False
-        had_rows = False
+        writer = None
+        out = None
 
-        # CSV を開いて、1 行ずつ書き込む
-        try:
-            f = open(output_path, "w", newline="", encoding="utf-8-sig")
-        except Exception as e:
+        def fail(e):
             self._log_from_thread(f"書き出しエラー: {e}")
             self.root.after(
                 0,
-                lambda: self._export_done(output_path, e, wrote=False, canceled=False),
+                lambda: self._export_done(job, e, wrote=False, canceled=False),
+            )
+
+        # 一時ファイルを開いて 1 ゲームずつ書き込み、成功したときだけ出力先と差し替える
+        # （中止・失敗時は前回の出力が残る。中身が前回と同じなら置き換えない）
+        if merge_items is None:
+            out = AtomicOutput(
+                output_path, skip_unchanged=True, prune=report_pages_pattern(output_path)
+            )
+            try:
+                writer = open_report_writer(fmt, out.open(), **self._compression_args(output_path))
+            except Exception as e:
+                out.discard()
+                fail(e)
+                return
+
+        # 前のジョブで取得済みのゲームは取り直さない
+        reused = [item for item in selected if self.jobs.was_fetched((steam_id, item[0]))]
+        to_fetch = [item for item in selected if not self.jobs.was_fetched((steam_id, item[0]))]
+        done = 0
+        fetched = {item[0] for item in reused}   # 出力に書く（保存済みの結果がある）AppID
+        if reused:
+            job.reused = len(reused)
+            self._log_from_thread(f"前のジョブで取得済みの {len(reused)} 件は保存済みの結果を使います")
+            done = len(reused)
+            self._set_progress(done, total, job=job)
+
+        # 重いゲームから並列に取得して保存する（plan → fetch → transform を容量つきキューでつなぐ）。
+        # 取得の順番は毎回変わるので、出力は取得後に選択順（名前順）で書く
+        ordered = order_longest_first(to_fetch, store)
+        meter = ThroughputMeter()
+        failed = []
+        self.memprof.checkpoint(f"ジョブ #{job.id} 開始", games=total)
+
+        def on_retry(category, attempt, attempts, e):
+            self._log_from_thread(
+                f"  再試行 {attempt}/{attempts - 1}（{FAILURE_LABELS[category]}）: {e}"
+            )
+
+        def fetch(item):
+            return call_with_retry(
+                lambda: self._fetch_game(api_key, steam_id, *item),
+                on_retry=on_retry,
+                should_cancel=lambda: job.cancel_requested,
+                cancel_event=job.cancel_event,
             )
-            return
 
-        writer = csv.DictWriter(
-            f,
-            fieldnames=["ゲーム名", "実績名", "説明", "取得状況"],
+        pipeline = ExportPipeline(
+            fetch=fetch,
+            transform=lambda item, record: store.save_record(item[0], record, item[1]),
+            concurrency=self.concurrency,
+            should_cancel=lambda: job.cancel_requested,
         )
-        writer.writeheader()
 
         try:
-            for idx, (appid, base_name) in enumerate(selected, start=1):
-                if self._cancel_export:
-                    canceled = True
-                    break
+            for (appid, base_name), rec, error in pipeline.run(ordered):
+                if error is not None:
+                    failed.append((appid, base_name, error))
+                    self._log_from_thread(f"  エラー: {base_name}: {error}")
+                    done += 1
+                    meter.tick()
+                    self._set_progress(done, total, meter, pipeline.queue_depths(), job)
+                    continue
+
+                self.jobs.mark_fetched((steam_id, appid))
+                if rec["achievements"] is None or rec["status"] is None:
+                    self._log_from_thread(f"  ⚠ 情報なし: {base_name}")
+                else:
+                    fetched.add(appid)
 
-                self._log_from_thread(f"{base_name} (AppID: {appid}) 取得中...")
-                try:
-                    jp, achievements, status = get_schema_and_achievements(
-                        api_key, steam_id, appid
-                    )
-                    if achievements is None or status is None:
-                        self._log_from_thread("  ⚠ 情報なし")
-                        self._set_progress(idx, total)
-                        continue
-
-                    game_name = jp or base_name
-
-                    for a in achievements:
-                        api = a.get("name")
-                        display = a.get("displayName", "")
-                        desc = a.get("description", "")
-                        achieved = "✅" if status.get(api) == 1 else "❌"
-
-                        writer.writerow(
-                            {
-                                "ゲーム名": game_name,
-                                "実績名": display,
-                                "説明": desc,
-                                "取得状況": achieved,
-                            }
-                        )
-                        had_rows = True
+                # 進捗更新（すーっとアニメーション）
+                done += 1
+                meter.tick()
+                self._set_progress(done, total, meter, pipeline.queue_depths(), job)
 
+            canceled = job.cancel_requested and done < total
+            # 選択順に書く（同じ内容なら毎回同じバイト列になり、skip_unchanged が効く）
+            if writer is not None and not canceled:
+                try:
+                    write_records(writer, store, [it for it in selected if it[0] in fetched])
                 except Exception as e:
                     self._log_from_thread(f"  エラー: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+        self.memprof.checkpoint(f"ジョブ #{job.id} 取得・書き出し", done=done)
 
-                # 進捗更新（すーっとアニメーション）
-                self._set_progress(idx, total)
+        all_items = merge_items if merge_items is not None else selected
 
-        finally:
-            f.close()
+        if out is not None:
+            if canceled or writer.rows == 0:
+                out.discard()   # 何も取れなかった回で前回の出力を消さない
+            else:
+                try:
+                    out.commit()
+                except Exception as e:
+                    fail(e)
+                    return
+
+        # 失敗分の再取得 → 既存の出力に合流させる（保存済みの結果から作り直す）
+        if merge_items is not None and not canceled:
+            out = atomic_output(
+                output_path, skip_unchanged=True, prune=report_pages_pattern(output_path)
+            )
+            try:
+                with out as tmp_path:
+                    writer = open_report_writer(
+                        fmt, tmp_path, **self._compression_args(output_path)
+                    )
+                    try:
+                        write_records(writer, store, merge_items)
+                    finally:
+                        writer.close()
+            except Exception as e:
+                fail(e)
+                return
+
+        if out is not None and not canceled and out.unchanged and not out.changed:
+            self._log_from_thread("前回の出力と同じ内容のため、ファイルは書き換えていません")
+
+        stats = stats_since(hedge_before, hedging_stats())
+        if stats["hedged"]:
+            self._log_from_thread(
+                f"ヘッジ: {stats['hedged']} 回（先着 {stats['hedge_wins']} 回）"
+                f" / 呼び出し {stats['calls']} 回"
+            )
 
-        # 結果ゼロ
-        if not had_rows:
+        # 失敗リスト（次回「失敗分を再取得」で使う）
+        if not canceled:
+            try:
+                path = write_dead_letter(output_path, fmt, failed, all_items)
+                if path:
+                    self._log_from_thread(f"取得失敗 {len(failed)} 件 → {path}")
+            except Exception as e:
+                self._log_from_thread(f"失敗リストの書き出しエラー: {e}")
+
+        wrote = writer is not None and writer.rows > 0 and not canceled
+
+        # 集計（達成率・取得日の分布・レア実績）を出力の横に書く
+        if wrote:
+            try:
+                path = write_summary(store, [a for a, _ in all_items], output_path)
+                self._log_from_thread(f"集計 → {path}")
+            except Exception as e:
+                self._log_from_thread(f"集計エラー: {e}")
+
+        # 結果ゼロ / 正常完了 / 中止（前回の出力のまま）
+        self.root.after(
+            0,
+            lambda: self._export_done(job, None, wrote=wrote, canceled=canceled),
+        )
+
+    def _offline_export_worker(self, job):
+        """保存済みの結果だけで書き出す（API は呼ばない）。各行に取得日時を付ける"""
+        selected, output_path, fmt = job.selected, job.output_path, job.fmt
+        store = job.store
+        total = len(selected)
+        out = atomic_output(output_path, skip_unchanged=True, prune=report_pages_pattern(output_path))
+        try:
+            with out as tmp_path:
+                writer = open_report_writer(
+                    fmt, tmp_path, with_freshness=True, **self._compression_args(output_path)
+                )
+                try:
+                    written = write_records(writer, store, selected)
+                finally:
+                    writer.close()
+        except Exception as e:
+            self._log_from_thread(f"書き出しエラー: {e}")
             self.root.after(
                 0,
-                lambda: self._export_done(
-                    output_path, None, wrote=False, canceled=canceled
-                ),
+                lambda: self._export_done(job, e, wrote=False, canceled=False),
             )
             return
 
-        # 正常完了 or 中止（部分的に出力）
+        if written < total:
+            self._log_from_thread(f"保存済みの結果が無いゲーム {total - written} 件は飛ばしました")
+        if out.unchanged and not out.changed:
+            self._log_from_thread("前回の出力と同じ内容のため、ファイルは書き換えていません")
+        self._set_progress(total, total, job=job)
+
+        wrote = writer.rows > 0
+        if wrote:
+            try:
+                path = write_summary(store, [a for a, _ in selected], output_path)
+                self._log_from_thread(f"集計 → {path}")
+            except Exception as e:
+                self._log_from_thread(f"集計エラー: {e}")
+
         self.root.after(
             0,
-            lambda: self._export_done(
-                output_path, None, wrote=True, canceled=canceled
-            ),
+            lambda: self._export_done(job, None, wrote=wrote, canceled=False),
         )
 
-    def _export_done(self, output_path, error, wrote: bool, canceled: bool):
-        """Export 完了時（メインスレッド側で実行）"""
+    def _export_done(self, job, error, wrote: bool, canceled: bool):
+        """ジョブ完了時（メインスレッド側で実行）。待機中のジョブがあれば続けて始める"""
+        output_path = job.output_path
+        if error is not None:
+            job.status = FAILED
+        elif canceled:
+            job.status = CANCELED
+        else:
+            job.status = DONE
         self._exporting = False
-        self.export_button.set_enabled(True)
         self.cancel_button.set_enabled(False)
+        self._refresh_job_list()
+        self.memprof.checkpoint(
+            f"ジョブ #{job.id} 完了",
+            log_lines=int(self.log_text.index("end-1c").split(".")[0]),
+        )
+
+        # 達成率が変わったので絞り込み用の索引を作り直す
+        self._rebuild_game_index()
+        self.filter_games()
 
         # ★ 解決ポイント：
         #  1) 上昇アニメーションを完全停止
@@ -1129,65 +1847,122 @@ class SteamAchievementsGUI:
         self._progress_current = float(self.progress_var.get())
         self.progress_bar.animate_to_zero()
 
+        # 次のジョブがあればすぐ始める（完了のダイアログはキューが空になったときだけ）
+        has_next = self._run_next_job()
+
         if error is not None:
-            messagebox.showerror("エラー", f"書き出し失敗:\n{error}")
+            messagebox.showerror("エラー", f"ジョブ #{job.id} の書き出し失敗:\n{error}")
             return
 
         if canceled:
-            if wrote:
-                messagebox.showinfo(
-                    "中止",
-                    f"処理を中止しましたが、一部は書き出されています。\n→ {output_path}",
-                )
-                self.log(f"中止（部分的に出力）→ {output_path}")
-            else:
-                messagebox.showinfo("中止", "処理を中止しました。CSV は出力されていません。")
-                self.log("中止されました。")
+            self.log(f"ジョブ #{job.id} は中止されました。")
+            if not has_next:
+                messagebox.showinfo("中止", "処理を中止しました。既存の出力はそのままです。")
             return
 
         if not wrote:
-            messagebox.showinfo("情報", "実績が取得できませんでした。")
+            msg = "保存済みの実績がありません。" if job.offline else "実績が取得できませんでした。"
+            self.log(f"ジョブ #{job.id}: {msg}")
+            if not has_next:
+                messagebox.showinfo("情報", msg)
             return
 
         self.log(f"完了 → {output_path}")
-        messagebox.showinfo("完了", "CSV 書き出しが完了しました。")
+        if not has_next:
+            messagebox.showinfo("完了", "書き出しが完了しました。")
 
     # -----------------------------
     # Config Save / Load
     # -----------------------------
     def save_config(self):
-        try:
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                json.dump(
-                    {
-                        "api_key": self.api_key.get(),
-                        "steam_id": self.steam_id.get(),
-                        "output_path": self.output_path.get(),
-                    },
-                    f,
-                    indent=2,
-                    ensure_ascii=False,
-                )
-        except Exception:
-            pass
+        """入力中の値をプロファイルへ反映（ファイル保存はまとめて遅延実行）"""
+        if self._applying_profile:
+            return
+        self.config_store.update(
+            api_key=self.api_key.get(),
+            steam_id=self.steam_id.get(),
+            output_path=self.output_path.get(),
+        )
 
-    def load_config(self):
-        if not os.path.exists(CONFIG_PATH):
+    def _open_store(self):
+        """取得済み実績の保存先を開く（アカウントごとに別フォルダ）"""
+        self.store = open_account_store(self._store_dir, self.steam_id.get().strip())
+
+    def _ensure_account_store(self):
+        """設定タブで SteamID が変わっていたら、そのアカウントの保存先に切り替える
+
+        入力中の 1 文字ごとにフォルダを作らないよう、一覧取得・Export の直前に確かめる。
+        """
+        root = store_root_for(self._store_dir, self.steam_id.get().strip())
+        if os.path.abspath(root) == os.path.abspath(self.store.root):
             return
+        self._open_store()
+        if self.games:
+            self._rebuild_game_index()
+            self.filter_games()
+
+    def load_config(self):
+        self._apply_profile(self.config_store.active())
+
+    def _apply_profile(self, prof):
+        """プロファイルの値を画面と実行設定に反映する"""
+        self._applying_profile = True
         try:
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                cfg = json.load(f)
-                self.api_key.set(cfg.get("api_key", ""))
-                self.steam_id.set(cfg.get("steam_id", ""))
-                self.output_path.set(cfg.get("output_path", DEFAULT_OUTPUT))
-        except Exception:
-            pass
+            self.profile_var.set(self.config_store.active_name)
+            self.api_key.set(prof.get("api_key", ""))
+            self.steam_id.set(prof.get("steam_id", ""))
+            self.output_path.set(prof.get("output_path") or DEFAULT_OUTPUT)
+        finally:
+            self._applying_profile = False
+
+        try:
+            self.concurrency = max(1, int(prof.get("concurrency", EXPORT_CONCURRENCY)))
+        except (TypeError, ValueError):
+            self.concurrency = EXPORT_CONCURRENCY
+        self.fetch_rarity = bool(prof.get("fetch_rarity", False))
+        try:
+            self.compression = resolve_compression(prof.get("compression"))
+        except ValueError as e:
+            self.log(f"設定エラー: {e}")
+            self.compression = None
+        self.compression_level = prof.get("compression_level")
+        configure_hedging(prof.get("hedge_requests", False))
+        try:
+            self.daily_call_limit = int(prof.get("daily_call_limit") or DAILY_LIMIT)
+        except (TypeError, ValueError):
+            self.daily_call_limit = DAILY_LIMIT
+        self._store_dir = prof.get("store_dir") or "achievement_store"
+        self._open_store()
+        self._stop_prefetch()
+        self.schema_cache = SchemaCache(prof.get("schema_cache_dir") or "schema_cache")
+        set_schema_cache(self.schema_cache)
+        if self.games:
+            self._rebuild_game_index()
+            self.filter_games()
+
+    def switch_profile(self, name):
+        """プロファイル切り替え（無ければ現在の設定をコピーして作成）"""
+        name = name.strip()
+        if not name or name == self.config_store.active_name:
+            return
+        if self.jobs.has_pending():
+            messagebox.showwarning("注意", "書き出し中はプロファイルを切り替えられません。")
+            self.profile_var.set(self.config_store.active_name)
+            return
+        self._apply_profile(self.config_store.switch(name))
+        self.settings_page.set_profiles(self.config_store.profile_names())
+        self.log(f"プロファイル切り替え → {name}")
 
 
 # -----------------------------
 # MAIN
 # -----------------------------
 if __name__ == "__main__":
+    cassette = install_from_env()
     root = tk.Tk()
     app = SteamAchievementsGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        if cassette is not None:
+            cassette.close()
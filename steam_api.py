@@ -0,0 +1,258 @@
+import threading
+
+import requests
+
+from fast_json import response_json, slim_owned_games, slim_schema
+from hedging import Hedger, MAX_EXTRA_RATIO
+
+API_TIMEOUT = 15  # 秒
+
+
+class PrivateProfileError(Exception):
+    """プロフィール（ゲームの詳細）が非公開で実績を取得できない"""
+
+
+# -----------------------------
+# 通信の差し替え口
+# -----------------------------
+# API への GET はすべて _http_get() を通る。http_cassette の記録・再生はここを差し替える。
+_transport = requests.get
+_transport_counted = True   # False（カセットの再生など）なら API 呼び出し数に数えない
+
+
+def set_transport(get, counted=True):
+    """requests.get と同じ形の関数に差し替え、元の関数を返す（None で元に戻す）
+
+    実際には Steam を呼ばない通信（カセットの再生）は counted=False にする。
+    """
+    global _transport, _transport_counted
+    prev = _transport
+    _transport = get or requests.get
+    _transport_counted = counted
+    return prev
+
+
+# 呼び出し数の記録先（api_quota.QuotaLedger）。None なら数えない
+_ledger = None
+# 実績マスタのキャッシュ（schema_cache.SchemaCache）。None なら毎回取る
+_schema_cache = None
+
+
+def set_schema_cache(cache):
+    global _schema_cache
+    _schema_cache = cache
+
+
+def set_quota_ledger(ledger):
+    global _ledger
+    _ledger = ledger
+
+
+def _http_get(url):
+    if _ledger is not None and _transport_counted:
+        _ledger.record_url(url)
+    return _transport(url, timeout=API_TIMEOUT)
+
+
+# -----------------------------
+# ヘッジ（遅い実績 API 呼び出しの保険。既定は無効）
+# -----------------------------
+_hedger = Hedger()
+
+
+def configure_hedging(enabled, max_extra_ratio=MAX_EXTRA_RATIO):
+    """ヘッジの有効・無効と、追加リクエストの上限（呼び出し数に対する割合）"""
+    _hedger.enabled = bool(enabled)
+    _hedger.max_extra_ratio = max_extra_ratio
+
+
+def hedging_stats():
+    return _hedger.stats()
+
+
+# -----------------------------
+# 同一リクエストの合流（single-flight）
+# -----------------------------
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """同じ key の処理が実行中なら、新たに実行せずその結果を待って共有する"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+_flight = SingleFlight()
+
+
+def _get_json(url):
+    """GET して JSON を返す。同時に同じ URL を要求したスレッドは 1 回の通信を共有する
+
+    戻り値は呼び出し元の間で共有されるので、書き換えないこと。
+    """
+    return _flight.do(url, lambda: _request_json(url))
+
+
+def _request_json(url):
+    """5xx / 429 は HTTPError。4xx でも本文が JSON なら返す（実績 API はエラー内容を JSON で返す）"""
+    resp = _hedger.call(lambda: _http_get(url))
+    if resp.status_code == 429 or resp.status_code >= 500:
+        resp.raise_for_status()
+    try:
+        return response_json(resp)
+    except ValueError:
+        resp.raise_for_status()
+        raise
+
+
+# -----------------------------
+# API
+# -----------------------------
+def get_owned_games(api_key, steam_id):
+    if not api_key or not steam_id:
+        raise ValueError("API Key と SteamID64 を設定タブで入力してください。")
+
+    url = (
+        "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+        f"?key={api_key}&steamid={steam_id}"
+        "&include_appinfo=1&include_played_free_games=1"
+    )
+    resp = _http_get(url)
+    resp.raise_for_status()
+    data = response_json(resp)
+    return slim_owned_games(data.get("response", {}).get("games", []))
+
+
+def get_player_achievements(api_key, steam_id, appid):
+    """実績の取得状況 → ({apiname: achieved}, {apiname: unlocktime})
+
+    実績のないゲームや非公開プロフィールは (None, None)
+    """
+    stats_url = (
+        "https://api.steampowered.com/ISteamUserStats/GetPlayerAchievements/v1/"
+        f"?key={api_key}&steamid={steam_id}&appid={appid}"
+    )
+    stats_resp = _get_json(stats_url)
+    playerstats = stats_resp.get("playerstats", {})
+    if "not public" in str(playerstats.get("error", "")).lower():
+        raise PrivateProfileError(playerstats["error"])
+    if "achievements" not in playerstats:
+        return None, None
+
+    status = {}
+    unlock_times = {}
+    for a in stats_resp["playerstats"]["achievements"]:
+        status[a["apiname"]] = a["achieved"]
+        if a.get("unlocktime"):
+            unlock_times[a["apiname"]] = a["unlocktime"]
+    return status, unlock_times
+
+
+def get_schema_and_achievements(api_key, steam_id, appid):
+    # 実績の取得状況
+    achievements_status, _ = get_player_achievements(api_key, steam_id, appid)
+    if achievements_status is None:
+        return None, None, None
+
+    # 実績のマスタ（日本語名）
+    jp_game_name, achievements = get_schema(api_key, appid)
+
+    return jp_game_name, achievements, achievements_status
+
+
+def get_schema(api_key, appid, lang="japanese"):
+    """実績マスタ（ゲーム名, 実績リスト）を返す（キャッシュがあればそれを使う）"""
+    if _schema_cache is not None:
+        cached = _schema_cache.get(appid, lang)
+        if cached is not None:
+            return cached
+
+    schema_url = (
+        "https://api.steampowered.com/ISteamUserStats/GetSchemaForGame/v2/"
+        f"?key={api_key}&appid={appid}&l={lang}"
+    )
+    schema_resp = _get_json(schema_url)
+
+    game = schema_resp.get("game", {})
+    game_name = game.get("gameName")
+    achievements = slim_schema(game.get("availableGameStats", {}).get("achievements", []))
+    # 実績のないゲームは "game": {} が返る。これもキャッシュして取り直さない
+    if _schema_cache is not None and "game" in schema_resp:
+        try:
+            _schema_cache.put(appid, lang, game_name, achievements)
+        except OSError:
+            pass   # キャッシュに書けなくても結果は返す
+    return game_name, achievements
+
+
+def get_global_percentages(appid):
+    """全プレイヤーの取得率 {apiname: %}（API Key 不要）"""
+    url = (
+        "https://api.steampowered.com/ISteamUserStats/"
+        f"GetGlobalAchievementPercentagesForApp/v2/?gameid={appid}"
+    )
+    data = _get_json(url)
+    result = {}
+    for a in data.get("achievementpercentages", {}).get("achievements", []):
+        try:
+            result[a["name"]] = float(a["percent"])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return result
+
+
+def fetch_game_record(api_key, steam_id, appid, with_rarity=False):
+    """1 ゲーム分の取得結果を dict で返す（AchievementStore.save に渡せる形）
+
+    with_rarity=True なら全体の取得率も取る（失敗しても他の結果は返す）。
+    """
+    status, unlock_times = get_player_achievements(api_key, steam_id, appid)
+    if status is None:
+        return {"game_name": None, "achievements": None, "status": None}
+
+    game_name, achievements = get_schema(api_key, appid)
+    record = {
+        "game_name": game_name,
+        "achievements": achievements,
+        "status": status,
+        "unlock_times": unlock_times,
+    }
+    if with_rarity:
+        try:
+            record["global_pct"] = get_global_percentages(appid)
+        except (requests.RequestException, ValueError):
+            record["global_pct"] = None
+    return record
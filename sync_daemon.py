@@ -0,0 +1,302 @@
+"""バックグラウンド同期モード
+
+  python sync_daemon.py [--profile 名前] [--interval 秒] [--html] [--once] [--offline]
+
+設定（プロファイル）の API Key / SteamID64 / 出力先を使い、定期的に所有ゲーム一覧を取り直す。
+プレイ時間か最終プレイ日時が変わったゲームだけ実績を再取得し、
+結果は achievement_store に保存、出力ファイルはアトミックに差し替える。
+前回の状態（sync_state.json）はアカウントごとの保存先（achievement_store/<SteamID64>）に置く。
+1 サイクルのリクエスト数は「1 + 2 × 変化したゲーム数」（プロファイルの fetch_rarity が
+有効なら全体の取得率の分が増えて 1 + 3 × N。取得率は API Key 不要なので 1 日の上限には数えない）。
+--offline は API を呼ばず、保存済みの結果だけで出力を作り直す（各行に取得日時つき）。
+STEAM_CASSETTE を設定すると通信を記録・再生する（http_cassette 参照）。
+--memprofile（または STEAM_MEMPROFILE=1）でサイクルの各段階のメモリ使用量を出す。
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+
+from achievement_store import AchievementStore, open_account_store
+from atomic_io import atomic_output, atomic_write_json
+from completion_stats import write_summary
+from config_store import ConfigStore
+from failure_policy import call_with_retry
+from http_cassette import install_from_env
+from memory_profile import MemoryProfiler, profiler_from_env
+from compressed_io import resolve_compression
+from report_writers import open_report_writer, write_records, report_extension, report_pages_pattern
+from api_quota import DAILY_LIMIT, QuotaLedger, plan_export
+from schema_cache import SchemaCache
+from steam_api import (
+    get_owned_games,
+    fetch_game_record,
+    configure_hedging,
+    set_quota_ledger,
+    set_schema_cache,
+)
+
+SYNC_STATE_NAME = "sync_state.json"   # アカウントの保存先（store.root）に置く
+SYNC_OUTPUT_NAME = "SteamGames_achievements"
+DEFAULT_INTERVAL = 3600  # 秒
+
+
+def _game_fingerprint(g):
+    """再取得が必要かどうかの判定材料"""
+    return [g.get("playtime_forever", 0), g.get("rtime_last_played", 0)]
+
+
+def _library_digest(games):
+    """所有ゲームの AppID の集合の要約（追加・削除の検知用）"""
+    appids = sorted(int(g.get("appid")) for g in games if g.get("appid") is not None)
+    return hashlib.sha256(json.dumps(appids).encode("utf-8")).hexdigest()[:16]
+
+
+class SyncDaemon:
+    def __init__(
+        self,
+        api_key,
+        steam_id,
+        output_dir,
+        formats=("csv",),
+        store=None,
+        state_path=None,
+        interval=DEFAULT_INTERVAL,
+        fetch_rarity=False,
+        compression=None,
+        compression_level=None,
+        ledger=None,
+        daily_limit=DAILY_LIMIT,
+        schema_cache=None,
+        memprof=None,
+        log=print,
+    ):
+        self.api_key = api_key
+        self.steam_id = steam_id
+        self.output_dir = output_dir
+        self.formats = tuple(formats)
+        self.store = store or AchievementStore()
+        self.state_path = state_path or os.path.join(self.store.root, SYNC_STATE_NAME)
+        self.interval = interval
+        self.fetch_rarity = fetch_rarity
+        self.compression = compression
+        self.compression_level = compression_level
+        self.ledger = ledger
+        self.daily_limit = daily_limit
+        self.schema_cache = schema_cache
+        self.memprof = memprof or MemoryProfiler(enabled=False)
+        self.log = log
+        self.stop_event = threading.Event()
+        self.state = self._load_state()
+
+    # -----------------------------
+    # 状態
+    # -----------------------------
+    def _load_state(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        if state.get("steam_id") != self.steam_id:
+            state = {"steam_id": self.steam_id}   # 別アカウントの状態は使わない
+        state.setdefault("games", {})
+        return state
+
+    def _save_state(self):
+        atomic_write_json(self.state_path, self.state)
+
+    # -----------------------------
+    # 1 サイクル
+    # -----------------------------
+    def run_cycle(self):
+        """変化したゲームだけ再取得し、出力を更新する。再取得したゲーム数を返す"""
+        games = get_owned_games(self.api_key, self.steam_id)
+        games = sorted(games, key=lambda g: g.get("name", "").lower())
+        self.store.save_owned_games(games)
+        self.memprof.checkpoint("一覧取得", games=len(games))
+
+        known = self.state["games"]
+        # ライブラリから消えたゲームは状態からも除く
+        owned = {str(g.get("appid")) for g in games}
+        for appid in [a for a in known if a not in owned]:
+            del known[appid]
+        library = _library_digest(games)
+        library_changed = self.state.get("library") != library
+
+        changed = [
+            g for g in games
+            if known.get(str(g.get("appid"))) != _game_fingerprint(g)
+        ]
+        self.log(f"所有ゲーム: {len(games)} / 更新対象: {len(changed)}")
+
+        # 今日の残り呼び出し数に収まる分だけ取る（残りは次のサイクルへ）
+        if self.ledger is not None and changed:
+            budget = plan_export(
+                [(g.get("appid"), g) for g in changed],
+                self.api_key,
+                self.ledger,
+                self.daily_limit,
+                store=self.store,
+                schema_cached=self.schema_cache.has if self.schema_cache is not None else None,
+            )
+            if not budget.fits:
+                self.log(
+                    f"呼び出し上限のため {len(changed)} 件中 {len(budget.within)} 件だけ更新"
+                    f"（見積もり {budget.needed} 回 / 残り {budget.remaining} 回）"
+                )
+                changed = [g for _, g in budget.within]
+
+        updated = 0
+        for g in changed:
+            if self.stop_event.is_set():
+                break
+            appid = g.get("appid")
+            try:
+                record = call_with_retry(
+                    lambda: fetch_game_record(
+                        self.api_key, self.steam_id, appid, with_rarity=self.fetch_rarity
+                    ),
+                    should_cancel=self.stop_event.is_set,
+                    cancel_event=self.stop_event,
+                )
+            except Exception as e:
+                # 状態を更新しないので次のサイクルで再試行される
+                self.log(f"  エラー: {g.get('name')} (AppID: {appid}): {e}")
+                continue
+
+            self.store.save_record(appid, record, g.get("name"))
+            known[str(appid)] = _game_fingerprint(g)
+            updated += 1
+        self.memprof.checkpoint("実績取得", updated=updated)
+
+        # ゲームの追加・削除だけでも出力を作り直す（中身が同じなら置き換えない）
+        if updated or library_changed or not self.state.get("written"):
+            self._write_outputs(games)
+            self.state["written"] = int(time.time())
+            self.state["library"] = library
+            self.memprof.checkpoint("出力", games=len(games))
+        self._save_state()
+        return updated
+
+    def write_offline(self):
+        """API を呼ばず、保存済みの一覧と結果だけで出力を作り直す"""
+        games = sorted(self.store.load_owned_games(), key=lambda g: g.get("name", "").lower())
+        self.log(f"保存済みのゲーム: {len(games)}（オフライン）")
+        self._write_outputs(games, with_freshness=True)
+        self.memprof.checkpoint("出力（オフライン）", games=len(games))
+
+    def _write_outputs(self, games, with_freshness=False):
+        for fmt in self.formats:
+            ext = report_extension(fmt, self.compression)
+            path = os.path.join(self.output_dir, SYNC_OUTPUT_NAME + ext)
+            out = atomic_output(path, skip_unchanged=True, prune=report_pages_pattern(path))
+            with out as tmp_path:
+                writer = open_report_writer(
+                    fmt,
+                    tmp_path,
+                    with_freshness=with_freshness,
+                    compression=self.compression if fmt != "html" else None,
+                    level=self.compression_level,
+                )
+                try:
+                    write_records(
+                        writer, self.store, [(g.get("appid"), g.get("name")) for g in games]
+                    )
+                finally:
+                    writer.close()
+            if out.changed:
+                self.log(f"出力を更新 → {path}")
+            else:
+                self.log(f"変更なし → {path}")
+
+        csv_path = os.path.join(self.output_dir, SYNC_OUTPUT_NAME + ".csv")
+        write_summary(self.store, [g.get("appid") for g in games], csv_path)
+
+    # -----------------------------
+    # 常駐
+    # -----------------------------
+    def run_forever(self):
+        while not self.stop_event.is_set():
+            try:
+                self.run_cycle()
+            except Exception as e:
+                self.log(f"同期エラー: {e}")
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Steam 実績の定期同期")
+    parser.add_argument("--config", default=None, help="設定ファイル（省略時はユーザー設定）")
+    parser.add_argument("--profile", default=None, help="使うプロファイル名")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL)
+    parser.add_argument("--html", action="store_true", help="HTML レポートも更新する")
+    parser.add_argument("--once", action="store_true", help="1 サイクルだけ実行する")
+    parser.add_argument(
+        "--compress", choices=["gzip", "zstd"], default=None,
+        help="CSV を圧縮して出力する（省略時はプロファイルの設定）",
+    )
+    parser.add_argument("--level", type=int, default=None, help="圧縮レベル")
+    parser.add_argument(
+        "--offline", action="store_true", help="API を呼ばず保存済みの結果から出力だけ作る"
+    )
+    parser.add_argument(
+        "--memprofile", action="store_true", help="各段階のメモリ使用量と確保の多い場所を出す"
+    )
+    args = parser.parse_args(argv)
+
+    config = ConfigStore(args.config)
+    cfg = config.profile(args.profile) if args.profile else config.active()
+    if cfg is None:
+        parser.error(f"プロファイルがありません: {args.profile}")
+
+    configure_hedging(cfg.get("hedge_requests", False))
+    ledger = QuotaLedger()
+    set_quota_ledger(ledger)
+    schema_cache = SchemaCache(cfg.get("schema_cache_dir") or "schema_cache")
+    set_schema_cache(schema_cache)
+    output_dir = os.path.dirname(cfg.get("output_path", "")) or "."
+    formats = ("csv", "html") if args.html else ("csv",)
+    memprof = profiler_from_env()
+    if args.memprofile and not memprof.enabled:
+        memprof = MemoryProfiler(enabled=True).start()
+
+    daemon = SyncDaemon(
+        cfg.get("api_key", ""),
+        cfg.get("steam_id", ""),
+        output_dir,
+        formats=formats,
+        store=open_account_store(cfg.get("store_dir") or "achievement_store", cfg.get("steam_id", "")),
+        interval=args.interval,
+        fetch_rarity=bool(cfg.get("fetch_rarity", False)),
+        compression=resolve_compression(args.compress or cfg.get("compression")),
+        compression_level=args.level if args.level is not None else cfg.get("compression_level"),
+        ledger=ledger,
+        daily_limit=int(cfg.get("daily_call_limit") or DAILY_LIMIT),
+        schema_cache=schema_cache,
+        memprof=memprof,
+    )
+    cassette = install_from_env()
+    try:
+        if args.offline:
+            daemon.write_offline()
+        elif args.once:
+            daemon.run_cycle()
+        else:
+            daemon.run_forever()
+    except KeyboardInterrupt:
+        daemon.stop()
+    finally:
+        ledger.flush()
+        memprof.stop()
+        if cassette is not None:
+            cassette.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""大きなライブラリの Export がメモリの予算（benchmarks/bench_memory_budget.py）に収まるか
+
+  python -m pytest tests
+
+ベンチと同じ関数で、合成した 10k ゲームを取得 → CSV → 保存済みから HTML → ファセット索引まで
+通し、tracemalloc のピークが DEFAULT_BUDGET_MB 以下かを見る。表示がある環境では
+実際の GUI の一覧（round_checks）とログまで含めて見る。
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from synthetic import synthetic_games
+
+import bench_memory_budget as bench
+from memory_profile import MemoryProfiler
+
+
+def _games(n=bench.DEFAULT_GAMES):
+    return sorted(synthetic_games(n), key=lambda g: g["name"].lower())
+
+
+def _peak_mb(profiler):
+    return profiler.peak / 2**20
+
+
+@pytest.fixture
+def profiler():
+    # checkpoint ごとのスナップショットは遅いので、ピークだけ見る（top=0）
+    p = MemoryProfiler(enabled=True, top=0, log=lambda msg: None).start()
+    yield p
+    p.stop()
+
+
+def test_export_and_index_within_budget(tmp_path, profiler):
+    games = _games()
+    store = bench.run_export(games, str(tmp_path), profiler)
+    bench.run_gui_model(games, store, profiler)
+
+    assert len(store.summary()) == len(games)
+    assert _peak_mb(profiler) <= bench.DEFAULT_BUDGET_MB
+
+
+def test_gui_within_budget(tmp_path, monkeypatch, profiler):
+    tk = pytest.importorskip("tkinter")
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        pytest.skip("表示がありません（xvfb-run で実行してください）")
+    monkeypatch.setenv("APPDATA", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+
+    games = _games()
+    store = bench.run_export(games, str(tmp_path), profiler)
+    rows = bench.run_gui(games, store, profiler)
+
+    assert rows == len(games)
+    assert _peak_mb(profiler) <= bench.DEFAULT_BUDGET_MB